@@ -0,0 +1,57 @@
+"""Time a frame of `Level.next_frame` for arrow key presses.
+
+With a batch bigger than 1 the keys are played that many at a time with
+`Level.next_frames`, like the game does with the keys that came in
+since the last frame, and the time is still per key.
+
+Run from the repository root:
+    PYTHONPATH=src python dev/bench_frame.py [level] [frames] [batch]
+"""
+import sys
+import time
+
+from blessed.keyboard import Keystroke
+
+from maze_gitb.core.render import Render
+from maze_gitb.core.terminal import get_terminal
+from maze_gitb.scene import Level
+
+term = get_terminal()
+render = Render()
+
+
+def arrow(name: str) -> Keystroke:
+    """Return the keystroke of an arrow key"""
+    return Keystroke("\x1b", code=getattr(term, name), name=name)
+
+
+def play(level: Level, keys: list, batch: int = 1) -> float:
+    """Return the mean time in seconds to handle each key and collect its frame"""
+    start = time.perf_counter()
+    if batch == 1:
+        for key in keys:
+            level.next_frame(key)
+            render.screen()
+    else:
+        for i in range(0, len(keys), batch):
+            level.next_frames(keys[i:i + batch])
+            render.screen()
+    return (time.perf_counter() - start) / len(keys)
+
+
+if __name__ == "__main__":
+    name = sys.argv[1] if len(sys.argv) > 1 else "1"
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    batch = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+    level = Level(name)
+
+    # get past the frames that show the maze, which only ticks take away
+    level.next_frame(Keystroke())
+    while not level.moving():
+        level.tick()
+    render.screen()
+
+    moves = ["KEY_RIGHT", "KEY_DOWN", "KEY_LEFT", "KEY_UP"]
+    keys = [arrow(moves[i // 3 % 4]) for i in range(frames)]
+    timings = [play(level, keys, batch) for _ in range(5)]
+    print(f"level {name}: {min(timings) * 1e6:.1f} µs per arrow key in batches of {batch} (best of 5 x {frames})")
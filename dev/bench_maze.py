@@ -0,0 +1,128 @@
+"""Benchmark maze generation against the old Cell object graph implementation.
+
+Also times every algorithm in `GENERATORS` at each size and checks
+`Maze.to_np_matrix` against the old per cell conversion on non-square mazes.
+
+Run from the repository root:
+    PYTHONPATH=src python dev/bench_maze.py [size ...]
+"""
+import random
+import sys
+import time
+from functools import partial
+from typing import Callable, Iterator, List
+
+import numpy as np
+
+from maze_gitb.core.generators import GENERATORS
+from maze_gitb.core.maze import Cell, E, Maze, N, S, W
+
+
+def legacy_to_np_matrix(cells: List[Cell], width: int, height: int) -> np.ndarray:
+    """`Maze.to_np_matrix` as it used to be, with its width based edge checks"""
+    str_matrix = np.array([[1] * (width * 2 + 1) for i in range(height * 2 + 1)])
+    for cell in cells:
+        x = cell.x * 2 + 1
+        y = cell.y * 2 + 1
+        str_matrix[y][x] = 0
+        if N not in cell and y > 0:
+            str_matrix[y - 1][x + 0] = 0
+        if S not in cell and y + 1 < width:
+            str_matrix[y + 1][x + 0] = 0
+        if W not in cell and x > 0:
+            str_matrix[y][x - 1] = 0
+        if E not in cell and x + 1 < width:
+            str_matrix[y][x + 1] = 0
+    return str_matrix
+
+
+def legacy_generate(width: int, height: int) -> np.ndarray:
+    """`Maze(width, height).randomize()` as it used to be, with one Cell object per position"""
+    cells = [Cell(x, y, [N, S, E, W]) for y in range(height) for x in range(width)]
+    legacy_to_np_matrix(cells, width, height)
+
+    def neighbors(cell: Cell) -> Iterator[Cell]:
+        x, y = cell.x, cell.y
+        for new_x, new_y in [(x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)]:
+            if 0 <= new_x < width and 0 <= new_y < height:
+                yield cells[new_x + new_y * width]
+
+    cell_stack = []
+    cell = random.choice(cells)
+    n_visited_cells = 1
+    while n_visited_cells < len(cells):
+        options = [c for c in neighbors(cell) if c.is_full()]
+        if len(options):
+            neighbor = random.choice(options)
+            cell.connect(neighbor)
+            cell_stack.append(cell)
+            cell = neighbor
+            n_visited_cells += 1
+        else:
+            cell = cell_stack.pop()
+    return legacy_to_np_matrix(cells, width, height)
+
+
+def generate(width: int, height: int, algorithm: str = "backtracker") -> np.ndarray:
+    """Array backed generation used by `Maze.generate`"""
+    maze = Maze(width, height)
+    maze.randomize(algorithm)
+    return maze.matrix
+
+
+def best_of(func: Callable, size: int, repeat: int = 5) -> float:
+    """Return the fastest of `repeat` runs in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(size, size)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def check_perfect(matrix: np.ndarray) -> None:
+    """A perfect maze has exactly one opening fewer than it has cells"""
+    height, width = matrix.shape[0] // 2, matrix.shape[1] // 2
+    openings = np.count_nonzero(matrix == 0) - height * width
+    assert openings == height * width - 1, "maze is not a spanning tree"
+
+
+def check_reference() -> None:
+    """The vectorized matrix must match the old conversion, which compared heights against the width"""
+    for name in GENERATORS:
+        for width, height in [(1, 1), (1, 9), (9, 1), (3, 17), (17, 3), (20, 10), (31, 64)]:
+            maze = Maze(width, height)
+            maze.randomize(name)
+            expected = legacy_to_np_matrix(maze.cells, width, height)
+            assert (maze.to_np_matrix() == expected).all(), f"{name} {width}x{height} differs"
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [64, 128, 256, 512]
+    check_reference()
+    print(f"{'size':>6} {'legacy (s)':>11} {'array (s)':>10} {'speedup':>8}")
+    for size in sizes:
+        check_perfect(generate(size, size))
+        old = best_of(legacy_generate, size)
+        new = best_of(generate, size)
+        print(f"{size:>6} {old:>11.4f} {new:>10.4f} {old / new:>7.1f}x")
+
+    print()
+    print(f"{'size':>6} {'legacy matrix (s)':>18} {'matrix (s)':>11}")
+    for size in sizes:
+        maze = Maze(size, size)
+        maze.randomize()
+        cells = maze.cells
+        old = best_of(lambda w, h: legacy_to_np_matrix(cells, w, h), size)
+        maze.cells = None
+        new = best_of(lambda w, h: maze.to_np_matrix(), size)
+        print(f"{size:>6} {old:>18.4f} {new:>11.5f}")
+
+    print()
+    print(f"{'size':>6}" + "".join(f"{name + ' (s)':>16}" for name in GENERATORS))
+    for size in sizes:
+        row = f"{size:>6}"
+        for name in GENERATORS:
+            check_perfect(generate(size, size, name))
+            row += f"{best_of(partial(generate, algorithm=name), size, repeat=3):>16.4f}"
+        print(row)
@@ -0,0 +1,96 @@
+"""Count the bytes sent to the terminal with and without the render back buffer.
+
+Plays every level with random arrow keys once the ticks took away the maze
+shown at the start, diffs each frame against a model of the terminal and
+checks that the diffed output leaves the screen exactly as the full output
+would. Runs itself with its output in a 120x40 pseudo terminal, since
+blessed only emits escape sequences to a terminal, and reports on stderr.
+
+Run from the repository root:
+    PYTHONPATH=src python dev/bench_render.py [frames per level] [seed]
+"""
+import fcntl
+import os
+import random
+import struct
+import subprocess
+import sys
+import termios
+import time
+from functools import partial
+from typing import Iterator, Tuple
+
+from blessed.keyboard import Keystroke
+
+from maze_gitb.core.render import Render
+from maze_gitb.core.screen import Screen, diff
+from maze_gitb.game import Scene
+from maze_gitb.scene import InfiniteLevel, Level
+
+render = Render()
+KEYS = [
+    Keystroke("\x1b", code=code, name=name)
+    for code, name in [(259, "KEY_UP"), (258, "KEY_DOWN"), (260, "KEY_LEFT"), (261, "KEY_RIGHT")]
+]
+
+
+def rerun_in_pty(width: int = 120, height: int = 40) -> int:
+    """Run this script again with stdout in a pseudo terminal, return its exit code"""
+    master, slave = os.openpty()
+    fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack("HHHH", height, width, 0, 0))
+    term = os.environ.get("TERM", "dumb")
+    env = dict(os.environ, TERM=term if term != "dumb" else "xterm-256color")
+    # stdin stays off the terminal so blessed doesn't wait for answers to its queries
+    return subprocess.call([sys.executable] + sys.argv, stdin=subprocess.DEVNULL, stdout=slave, env=env)
+
+
+def frames(level: Scene, count: int) -> Iterator[str]:
+    """Yield the full output of each frame while playing level, the frames of its intro first"""
+    level.next_frame(Keystroke())
+    yield render.screen()
+    # get past the frames that show the maze, which only ticks take away
+    while not level.moving():
+        level.tick()
+        yield render.screen()
+    for _ in range(count):
+        result = level.next_frame(random.choice(KEYS))
+        yield render.screen()
+        if result:
+            break
+
+
+def play(level: Scene, count: int) -> Tuple[int, int, float]:
+    """Return bytes of full and of diffed output, and seconds spent diffing"""
+    width, height = render.term.width, render.term.height
+    expected, received = Screen(width, height), Screen(width, height)
+    back, front = Screen(width, height, blank=" "), Screen(width, height)
+    full = diffed = 0
+    elapsed = 0.0
+    for frame in frames(level, count):
+        start = time.perf_counter()
+        back.feed(frame)
+        output = diff(front, back) + render.term.home
+        elapsed += time.perf_counter() - start
+
+        expected.feed(frame)
+        received.feed(output)
+        assert expected.glyphs == received.glyphs and expected.styles == received.styles, "screens differ"
+        full += len(frame.encode())
+        diffed += len(output.encode())
+    return full, diffed, elapsed
+
+
+if __name__ == "__main__":
+    if not os.isatty(sys.stdout.fileno()):
+        sys.exit(rerun_in_pty())
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    random.seed(int(sys.argv[2]) if len(sys.argv) > 2 else 1)
+    levels = [(f"level {i}", Level(str(i))) for i in range(9)] + [("infinite", InfiniteLevel(True))]
+
+    report = partial(print, file=sys.stderr)
+    report(f"{render.term.width}x{render.term.height} {render.term.kind}")
+    report(f"{'scene':>10} {'full (B)':>10} {'diffed (B)':>11} {'ratio':>7} {'diff (ms)':>10}")
+    for name, level in levels:
+        full, diffed, elapsed = play(level, count)
+        report(f"{name:>10} {full:>10} {diffed:>11} {full / diffed:>6.1f}x {elapsed * 1e3:>10.1f}")
@@ -0,0 +1,99 @@
+"""Time the frames of infinite levels bigger than the terminal.
+
+Walks the shortest path toward the goal with the whole maze shown, so the
+camera keeps following the player and redrawing the view, and reports the
+time and the bytes per frame for each maze size. Both should stay about
+the same however big the maze is. Checks after every frame that the player
+is drawn where the camera puts it. Runs itself in a 120x40 pseudo terminal
+and reports on stderr, like `bench_render.py`.
+
+Run from the repository root:
+    PYTHONPATH=src python dev/bench_viewport.py [frames per maze] [seed]
+"""
+import os
+import random
+import sys
+import time
+from functools import partial
+from typing import Tuple
+
+from bench_render import rerun_in_pty
+from blessed.keyboard import Keystroke
+
+from maze_gitb.core.render import Render
+from maze_gitb.core.solver import distance_field
+from maze_gitb.scene import InfiniteLevel
+from maze_gitb.utils import Vec
+
+render = Render()
+KEYS = {
+    Vec(0, -1): Keystroke("\x1b", code=259, name="KEY_UP"),
+    Vec(0, 1): Keystroke("\x1b", code=258, name="KEY_DOWN"),
+    Vec(-1, 0): Keystroke("\x1b", code=260, name="KEY_LEFT"),
+    Vec(1, 0): Keystroke("\x1b", code=261, name="KEY_RIGHT"),
+}
+SIZES = [None, Vec(100, 50), Vec(200, 100), Vec(400, 200)]
+
+
+def play(level: InfiniteLevel, count: int) -> Tuple[int, int, float, float, int]:
+    """Return frames played, camera moves, mean and worst seconds per frame and bytes written"""
+    level = level.instance
+    while level.first_act or level.wait > 0:
+        level.tick()
+        render.screen()
+    level.next_frame(Keystroke("h"))
+    render.screen()
+
+    maze, player = level.maze, level.player
+    origin = maze.char_matrix.origin
+    field = distance_field(~maze.char_matrix.walls, tuple(reversed(level.end_loc - origin)))
+    frames = moves = written = 0
+    total = worst = 0.0
+    offset = level.viewport.offset
+    for _ in range(count):
+        step = field.next_step(tuple(reversed(player.avi.coords - origin)))
+        if step is None or field.distance(step) == 0:
+            # the goal starts a new maze
+            break
+        key = KEYS[origin + (step[1], step[0]) - player.avi.coords]
+        start = time.perf_counter()
+        level.next_frame(key)
+        written += len(render.screen().encode())
+        elapsed = time.perf_counter() - start
+
+        x, y = player.avi.coords - level.viewport.offset
+        assert render.back.glyphs[y][x] == player.avi.fill, "player is not where the camera shows it"
+        frames += 1
+        moves += level.viewport.offset != offset
+        offset = level.viewport.offset
+        total += elapsed
+        worst = max(worst, elapsed)
+    return frames, moves, total / max(frames, 1), worst, written
+
+
+if __name__ == "__main__":
+    if not os.isatty(sys.stdout.fileno()):
+        sys.exit(rerun_in_pty())
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    random.seed(int(sys.argv[2]) if len(sys.argv) > 2 else 1)
+    render.use_back_buffer()
+
+    report = partial(print, file=sys.stderr)
+    report(f"{render.term.width}x{render.term.height} {render.term.kind}")
+    report(f"{'cells':>9} {'world':>9} {'build (s)':>10} {'frames':>7} {'moves':>6} "
+           f"{'mean (us)':>10} {'max (us)':>9} {'B/frame':>8}")
+    for size in SIZES:
+        InfiniteLevel.playing.set(None)
+        start = time.perf_counter()
+        level = InfiniteLevel(True, size=size)
+        build = time.perf_counter() - start
+        level.render(hard=True)
+        render.screen()
+        frames, moves, mean, worst, written = play(level, count)
+        maze, world = level.instance.maze, level.instance.viewport.world
+        report(
+            f"{maze.width:>4}x{maze.height:<4} {world.x:>4}x{world.y:<4} "
+            f"{build:>10.2f} {frames:>7} {moves:>6} {mean * 1e6:>10.0f} {worst * 1e6:>9.0f} "
+            f"{written / max(frames, 1):>8.0f}"
+        )
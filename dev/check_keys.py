@@ -0,0 +1,121 @@
+"""Check how the game loop takes the keys pressed, on a headless terminal and a manual clock.
+
+Fails with an assertion error.
+
+Run from the repository root:
+    PYTHONPATH=src python dev/check_keys.py
+"""
+import asyncio
+
+from blessed.keyboard import Keystroke
+
+from maze_gitb.core.terminal import use_headless
+
+terminal = use_headless(120, 40)
+
+from maze_gitb.core.keys import KeyRepeat  # noqa: E402
+from maze_gitb.core.scheduler import ManualClock, Scheduler  # noqa: E402
+from maze_gitb.game import Game, Scene  # noqa: E402
+
+
+class Ticking(Scene):
+    """A scene that only ticks"""
+
+    ticks = True
+
+
+class Intro(Ticking):
+    """A ticking scene that takes keys after two ticks, like a level"""
+
+    def __init__(self):
+        super().__init__()
+        self.wait = 2
+
+    def tick(self) -> str:
+        """Go on with the intro"""
+        self.wait -= 1
+        return ""
+
+    def waiting(self) -> bool:
+        """Return True until the intro is over"""
+        return self.wait > 0
+
+
+def new_game(clock: ManualClock, scene: Scene = None) -> Game:
+    """Return a game of one ticking scene, ticking on clock"""
+    scene = scene or Ticking()
+    game = Game([scene], scene, scene, scene, scene, scene, scene)
+    game.scheduler = Scheduler(period=0.05, clock=clock)
+    # the default limit, whatever the environment says
+    game.key_repeat = KeyRepeat()
+    return game
+
+
+def arrow(name: str, code: int) -> Keystroke:
+    """Return the keystroke of an arrow key"""
+    return Keystroke("\x1b", code=code, name=name)
+
+
+async def check_order() -> None:
+    """A key taken while waiting for a tick comes before the keys pressed after it"""
+    clock = ManualClock()
+    game = new_game(clock)
+    keys: "asyncio.Queue[Keystroke]" = asyncio.Queue()
+    waiting = asyncio.ensure_future(game.next_keys(keys))
+    await asyncio.sleep(0)
+    clock.advance(0.05)
+    # the tick comes first, the wait for a key goes on
+    assert await waiting is None and game.getting is not None
+    keys.put_nowait(Keystroke("a"))
+    await asyncio.sleep(0)
+    keys.put_nowait(Keystroke("b"))
+    assert game.getting.done()
+    assert await game.next_keys(keys) == ["a", "b"]
+
+
+async def check_batch() -> None:
+    """All the keys in the queue come together, held arrows limited and EOF last"""
+    from maze_gitb.game import EOF
+
+    game = new_game(ManualClock())
+    keys: "asyncio.Queue[Keystroke]" = asyncio.Queue()
+    right = arrow("KEY_RIGHT", 261)
+    for val in [right] * 4 + [Keystroke("g"), EOF]:
+        keys.put_nowait(val)
+    assert await game.next_keys(keys) == [right, right, "g"]
+    try:
+        await game.next_keys(keys)
+    except EOFError:
+        pass
+    else:
+        raise AssertionError("no EOFError after the last key")
+
+
+async def check_script() -> None:
+    """The keys pressed on a headless terminal wait for the intro, then come one a frame"""
+    clock = ManualClock()
+    game = new_game(clock, Intro())
+    game.scripted = True
+    keys: "asyncio.Queue[Keystroke]" = asyncio.Queue()
+    terminal.press("a", "b")
+    for _ in range(2):
+        waiting = asyncio.ensure_future(game.next_keys(keys))
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        clock.advance(0.05)
+        assert await waiting is None
+        game.current_scene.tick()
+    assert await game.next_keys(keys) == ["a"]
+    assert await game.next_keys(keys) == ["b"]
+    try:
+        await game.next_keys(keys)
+    except EOFError:
+        pass
+    else:
+        raise AssertionError("no EOFError after the last key")
+
+
+if __name__ == "__main__":
+    for check in (check_order, check_batch, check_script):
+        asyncio.run(check())
+        print(f"{check.__name__}: ok")
@@ -0,0 +1,84 @@
+"""Check the timing of the tick scheduler, the timers and the echo on a manual clock.
+
+The echo is played into a `WavCapture`, which needs no sound device.
+
+Nothing waits, the clock is moved by hand, so the checks take no time and
+give the same result on any machine. Fails with an assertion error.
+
+Run from the repository root:
+    PYTHONPATH=src python dev/check_timers.py
+"""
+import os
+import tempfile
+import time
+import wave
+from typing import List
+
+from maze_gitb.core import sound
+from maze_gitb.core.audio import WavCapture, close_backend, use_backend
+from maze_gitb.core.scheduler import ManualClock, Scheduler, Timers, timers
+from maze_gitb.utils import Vec  # type: ignore
+
+
+def check_timers() -> None:
+    """Actions run when due, in the order they were added when due together"""
+    clock = ManualClock()
+    fired: List[str] = []
+    t = Timers(clock=clock)
+    t.after(0.3, fired.append, "late")
+    t.after(0.1, fired.append, "first")
+    t.after(0.1, fired.append, "second")
+    assert t.timeout() == 0.1
+    clock.advance(0.099)
+    assert t.fire() == 0 and abs(t.timeout() - 0.001) < 1e-9
+    clock.advance(0.001)
+    assert t.fire() == 2 and fired == ["first", "second"]
+    clock.advance(1)
+    assert t.fire() == 1 and fired[-1] == "late" and t.timeout() is None
+
+
+def check_scheduler() -> None:
+    """Ticks keep a fixed period, catch up a little and drop a long backlog"""
+    clock = ManualClock()
+    scheduler = Scheduler(period=0.05, max_catch_up=5, clock=clock)
+    assert not scheduler.due()
+    clock.advance(0.05)
+    assert scheduler.due() and not scheduler.due()
+    clock.advance(0.12)
+    # two ticks late, both are caught up
+    assert scheduler.due() and scheduler.due() and not scheduler.due()
+    clock.advance(1)
+    assert scheduler.due() and scheduler.dropped > 0 and not scheduler.due()
+
+
+def check_echo() -> None:
+    """The second sound of an echo is timed, not waited for, and plays when due"""
+    clock = ManualClock()
+    timers.clock = clock
+    timers.clear()
+    path = os.path.join(tempfile.mkdtemp(), "echo.wav")
+    capture = use_backend(WavCapture(path, clock=clock))
+    # loading the sound the first time it plays isn't what is timed
+    sound.sound("first_echo.wav")
+    start = time.perf_counter()
+    sound.play_echo(Vec(1, 0), 10)
+    assert time.perf_counter() - start < 0.05, "play_echo held up the game"
+    assert len(timers) == 1 and timers.timeout() == 2.0
+    _, _, action, args = timers.heap[0]
+    assert action is sound.play_echo_2 and args == (Vec(1, 0), 10)
+    clock.advance(2)
+    assert timers.fire() == 1 and not timers
+    assert [(t, name) for t, name, _ in capture.played] == [(0, "first_echo.wav"), (2, "second_echo.wav")]
+    # both play to the end, the second one 2 s in
+    second = sound.sound("second_echo.wav").clip.duration
+    clock.advance(5)
+    close_backend()
+    with wave.open(path) as f:
+        length = f.getnframes() / f.getframerate()
+    assert abs(length - 2 - second) < 0.001, length
+
+
+if __name__ == "__main__":
+    for check in (check_timers, check_scheduler, check_echo):
+        check()
+        print(f"{check.__name__}: ok")
@@ -0,0 +1,203 @@
+"""Load test the game server with synthetic players.
+
+Starts `maze_gitb.server` in a subprocess, or uses the one given with
+--connect, and connects --players players. Each tells a window of 120x40,
+starts a game and then presses a random arrow key or g (the hint) --rate
+times a second, give or take a fifth. A player whose game ends connects
+again. Once every player
+is playing it waits --warmup seconds, measures for --seconds and reports:
+
+- frames/s received, in all and per player. A frame ends by sending the
+  cursor home, ESC [ H.
+- input latency, from sending a key to the end of the next frame, for the
+  keys answered before the next key is sent. A key that drew nothing, like
+  a move into a wall or any key while a maze is shown, is taken as
+  answered by the next frame a tick draws, so the p99 can be as long as the
+  time between keys however fast the server is. The keys not answered drew
+  nothing and no tick did either, or the server fell that far behind.
+- RSS per session, how much the resident memory of the server grew with
+  the players. Read from /proc, so only on Linux and for a server started here.
+- CPU, how much of a core the server used while measuring.
+
+Run from the repository root:
+    PYTHONPATH=src python dev/loadtest.py [--players 100] [--seconds 10] [--rate 5]
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from maze_gitb.server import IAC, NAWS, SB, SE, WILL
+
+HOME = b"\x1b[H"
+# the window size the players tell, 120x40
+WINDOW = bytes([IAC, WILL, NAWS, IAC, SB, NAWS, 0, 120, 0, 40, IAC, SE])
+KEYS = [b"\x1b[A", b"\x1b[B", b"\x1b[C", b"\x1b[D", b"g"]
+
+
+class Stats:
+    """What the players measured"""
+
+    def __init__(self) -> None:
+        self.measuring = False
+        self.frames = 0
+        self.latencies: List[float] = []
+        self.unanswered = 0
+        self.games = 0
+        self.playing = 0
+
+
+async def player(host: str, port: int, rate: float, stats: Stats, rng: random.Random) -> None:
+    """Play games with random keys until cancelled"""
+    first = True
+    while True:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(WINDOW)
+        # when the key not answered yet was sent
+        sent: Optional[float] = None
+        started = asyncio.Event()
+
+        async def receive() -> None:
+            """Count the frames and take the latency of the key they answer"""
+            nonlocal sent
+            tail = b""
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    return
+                data = tail + data
+                frames = data.count(HOME)
+                # a frame end cut in two is counted with the next data
+                tail = data[-2:]
+                if not frames:
+                    continue
+                now = time.perf_counter()
+                started.set()
+                if stats.measuring:
+                    stats.frames += frames
+                    if sent is not None:
+                        stats.latencies.append(now - sent)
+                sent = None
+
+        receiving = asyncio.ensure_future(receive())
+        try:
+            # the title menu, then start
+            title = asyncio.ensure_future(started.wait())
+            await asyncio.wait({receiving, title}, return_when=asyncio.FIRST_COMPLETED)
+            title.cancel()
+            writer.write(b" ")
+            stats.games += 1
+            if first:
+                stats.playing += 1
+                first = False
+            while not receiving.done():
+                await asyncio.sleep(rng.uniform(0.8, 1.2) / rate)
+                if sent is not None and stats.measuring:
+                    stats.unanswered += 1
+                writer.write(rng.choice(KEYS))
+                sent = time.perf_counter()
+        finally:
+            receiving.cancel()
+            writer.close()
+
+
+def rss(pid: int) -> float:
+    """Return the resident memory of process pid in MB"""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def cpu_seconds(pid: int) -> float:
+    """Return the CPU time process pid used so far"""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def start_server() -> Tuple[subprocess.Popen, str, int]:
+    """Start a server on a free port and return it with its address"""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "maze_gitb.server", "--port", "0", "--log-level", "WARNING"],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    line = server.stdout.readline()
+    if not line.startswith("serving on "):
+        server.kill()
+        sys.exit(f"The server didn't start: {line!r}")
+    host, port = line.split()[-1].rsplit(":", 1)
+    return server, host, int(port)
+
+
+async def load_test(args: argparse.Namespace) -> None:
+    """Run the players and print what they measured"""
+    server = None
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+    else:
+        server, host, port = start_server()
+    pid = server.pid if server else None
+    idle = rss(pid) if pid else 0.0
+    stats = Stats()
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    players = [
+        asyncio.ensure_future(player(host, int(port), args.rate, stats, random.Random(rng.random())))
+        for _ in range(args.players)
+    ]
+    try:
+        while stats.playing < args.players:
+            await asyncio.sleep(0.1)
+            for task in players:
+                if task.done():
+                    task.result()
+        joined = time.perf_counter() - started
+        await asyncio.sleep(args.warmup)
+        cpu = cpu_seconds(pid) if pid else 0.0
+        stats.measuring = True
+        games = stats.games
+        await asyncio.sleep(args.seconds)
+        stats.measuring = False
+        used = cpu_seconds(pid) - cpu if pid else 0.0
+        loaded = rss(pid) if pid else 0.0
+    finally:
+        for task in players:
+            task.cancel()
+        await asyncio.gather(*players, return_exceptions=True)
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    latencies = np.array(stats.latencies) * 1e3
+    print(f"{args.players} players joined in {joined:.1f} s, measured {args.seconds:g} s, "
+          f"{stats.games - games} games started while measuring")
+    rate = stats.frames / args.seconds
+    print(f"frames/s: {rate:.0f} in all, {rate / args.players:.1f} per player")
+    if len(latencies):
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(f"input latency: p50 {p50:.1f} ms, p99 {p99:.1f} ms, max {latencies.max():.1f} ms, "
+              f"{len(latencies)} keys answered and {stats.unanswered} not")
+    if pid:
+        print(f"server RSS: {idle:.1f} MB idle, {loaded:.1f} MB with the players, "
+              f"{(loaded - idle) / args.players:.2f} MB per session")
+        print(f"server CPU: {used / args.seconds:.0%} of a core")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the game server with synthetic players")
+    parser.add_argument("--players", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=10, help="how long to measure")
+    parser.add_argument("--warmup", type=float, default=3, help="seconds to wait once everyone plays")
+    parser.add_argument("--rate", type=float, default=5, help="keys per second per player")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--connect", help="host:port of a running server instead of starting one")
+    asyncio.run(load_test(parser.parse_args()))
@@ -0,0 +1,141 @@
+"""Play the menus, every level and the infinite level on a headless terminal and check their frames.
+
+Frames go through the render back buffer into a `HeadlessDisplay`, as they
+would go to the terminal in the game. The snapshot of the screen after every
+frame is hashed and compared with the hashes in `dev/snapshots.json`, so a
+change to what the game draws shows up as the first frame that looks
+different. Also reports the bytes and the cost of the frames of each scene.
+The player walks the shortest path to the goal, so no collision timing is
+involved and the same seed always gives the same frames. Halfway through,
+the terminal gets smaller and then back to its size.
+
+Run from the repository root, no terminal needed:
+    PYTHONPATH=src python dev/render_snapshots.py [--update]
+"""
+import json
+import os
+import random
+import sys
+from functools import partial
+from typing import Iterator, List, Union
+
+from maze_gitb.core.terminal import use_headless
+
+# the game modules get the terminal when they are imported
+term = use_headless(120, 40)
+SIZE = (term.width, term.height)
+
+from blessed.keyboard import Keystroke  # noqa: E402
+
+from maze_gitb.core.headless import HeadlessDisplay  # noqa: E402
+from maze_gitb.core.render import Render  # noqa: E402
+from maze_gitb.core.solver import distance_field  # noqa: E402
+from maze_gitb.game import Scene  # noqa: E402
+from maze_gitb.scene import (  # noqa: E402
+    InfiniteLevel, Level, credit_scene, pause_menu, title_scene
+)
+from maze_gitb.utils import Vec  # noqa: E402
+
+# a keystroke, a tick or a new size of the terminal
+Key = Union[Keystroke, None, Vec]
+SMALL = Vec(90, 30)
+SNAPSHOTS = os.path.join(os.path.dirname(__file__), "snapshots.json")
+ARROWS = {Vec(0, -1): "\x1b[A", Vec(0, 1): "\x1b[B", Vec(1, 0): "\x1b[C", Vec(-1, 0): "\x1b[D"}
+render = Render()
+
+
+def press(key: str) -> Keystroke:
+    """Return the keystroke of what the keyboard sends for a key"""
+    term.press(key)
+    return term.inkey()
+
+
+def menu(scene: Scene) -> Iterator[Key]:
+    """Yield keys moving the cursor of a menu up and down"""
+    yield Keystroke()
+    for i, key in enumerate("BBABBBAA"):
+        if i in (3, 6):
+            yield SMALL if i == 3 else Vec(*SIZE)
+        yield press(f"\x1b[{key}")
+
+
+def level(scene: Union[Level, InfiniteLevel], steps: int = 120) -> Iterator[Key]:
+    """Yield keys walking toward the goal of a level, and None for ticks in between"""
+    scene = getattr(scene, "instance", None) or scene
+    while scene.first_act or scene.wait > 0:
+        yield None
+    maze, player = scene.maze, scene.player
+    origin = maze.char_matrix.origin
+    field = distance_field(~maze.char_matrix.walls, tuple(reversed(scene.end_loc - origin)))
+    for i in range(steps):
+        if i in (10, 30):
+            yield press("g")
+        if i in (50, 52):
+            yield press("h")
+        if i in (20, 40):
+            yield SMALL if i == 20 else Vec(*SIZE)
+        step = field.next_step(tuple(reversed(player.avi.coords - origin)))
+        if step is None or field.distance(step) == 0:
+            # the goal ends the level
+            return
+        yield press(ARROWS[origin + (step[1], step[0]) - player.avi.coords])
+        if i % 3 == 0:
+            yield None
+
+
+def play(scene: Scene, keys: Iterator[Key]) -> Iterator[HeadlessDisplay]:
+    """Play scene with keys and yield the display its frames went to after each"""
+    # a level may end while the terminal is small
+    use_headless(*SIZE)
+    render.use_back_buffer()
+    display = HeadlessDisplay(term.width, term.height)
+    for key in keys:
+        if key is None:
+            scene.tick()
+        elif isinstance(key, Vec):
+            # what the game does on SIGWINCH
+            use_headless(*key)
+            render.resize()
+            display.resize(*key)
+            scene.resize()
+        else:
+            scene.next_frame(key)
+        display.write(render.screen())
+        yield display
+
+
+if __name__ == "__main__":
+    update = "--update" in sys.argv
+    random.seed(1)
+    scenes = [("title", title_scene, menu), ("pause", pause_menu, menu), ("credits", credit_scene, menu)]
+    scenes += [(f"level {i}", Level(str(i)), level) for i in range(9)]
+    scenes += [("infinite", InfiniteLevel(True), level)]
+
+    expected = {}
+    if not update and os.path.exists(SNAPSHOTS):
+        with open(SNAPSHOTS) as f:
+            expected = json.load(f)
+    digests = {}
+    failed: List[str] = []
+    report = partial(print, file=sys.stderr)
+    for name, scene, keys in scenes:
+        digests[name] = []
+        for display in play(scene, keys(scene)):
+            digests[name].append(display.snapshot().digest())
+        report(f"{name:>10}: {display.report()}")
+
+        frames = expected.get(name)
+        if frames is None:
+            continue
+        different = [i for i, (a, b) in enumerate(zip(digests[name], frames)) if a != b]
+        if different or len(frames) != len(digests[name]):
+            frame = different[0] if different else min(len(frames), len(digests[name]))
+            failed.append(f"{name} looks different from frame {frame} of {len(digests[name])}")
+
+    if update or not os.path.exists(SNAPSHOTS):
+        with open(SNAPSHOTS, "w") as f:
+            json.dump(digests, f, indent=0)
+        report(f"saved {sum(len(d) for d in digests.values())} snapshots to {SNAPSHOTS}")
+    for message in failed:
+        report(message)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,64 @@
+"""Summarise a frame trace written with `MAZE_GITB_TRACE`.
+
+Prints, for every scene and for all of them together, percentiles of the
+frame time and of its parts, the bytes per frame, and a histogram of the
+frame times in buckets that double in width.
+
+Run from the repository root:
+    MAZE_GITB_TRACE=trace.jsonl PYTHONPATH=src python -m maze_gitb.main
+    python dev/trace_report.py trace.jsonl [scene ...]
+"""
+import json
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+
+PARTS = ["frame_us", "update_us", "screen_us", "write_us", "bytes", "escapes", "draws"]
+PERCENTILES = [50, 90, 99, 100]
+# upper bounds of the histogram buckets, in microseconds
+BUCKETS = [2 ** i * 125 for i in range(10)]
+
+
+def load(path: str) -> Dict[str, Dict[str, np.ndarray]]:
+    """Return the columns of the trace by scene, with the total frame time added"""
+    columns: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            record["frame_us"] = record["update_us"] + record["screen_us"] + record["write_us"]
+            for scene in (record["scene"], "all"):
+                for part in PARTS:
+                    columns[scene][part].append(record[part])
+    return {scene: {part: np.array(values) for part, values in parts.items()} for scene, parts in columns.items()}
+
+
+def histogram(frame_us: np.ndarray, width: int = 50) -> List[str]:
+    """Return the lines of a histogram of frame times"""
+    counts = np.bincount(np.searchsorted(BUCKETS, frame_us), minlength=len(BUCKETS) + 1)
+    lines = []
+    for i, count in enumerate(counts):
+        label = f"<= {BUCKETS[i] / 1e3:g} ms" if i < len(BUCKETS) else f"> {BUCKETS[-1] / 1e3:g} ms"
+        bar = "#" * int(np.ceil(count / counts.max() * width)) if count else ""
+        lines.append(f"  {label:>11} {count:>7} {bar}")
+    return lines
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    scenes = load(sys.argv[1])
+    wanted = sys.argv[2:] or sorted(scenes, key=lambda scene: (scene == "all", scene))
+    for scene in wanted:
+        parts = scenes[scene]
+        print(f"{scene}: {len(parts['frame_us'])} frames")
+        print(f"  {'':>11} " + " ".join(f"{f'p{p}':>8}" for p in PERCENTILES) + f" {'mean':>8}")
+        for part in PARTS:
+            values = parts[part]
+            print(
+                f"  {part:>11} "
+                + " ".join(f"{v:>8.0f}" for v in np.percentile(values, PERCENTILES))
+                + f" {values.mean():>8.1f}"
+            )
+        print("\n".join(histogram(parts["frame_us"])))
@@ -0,0 +1,324 @@
+"""Sound backends and the decoded sounds they play.
+
+A sound is decoded from its WAV file the first time it plays and kept in
+memory, see `clip`, and the backend that plays it is made on first use
+too, so nothing is loaded before the game needs it. The backends are:
+
+- `OpenALBackend` plays the sounds in 3D with OpenAL
+- `NullBackend` plays nothing, for headless terminals and servers
+- `WavCapture` mixes what was played, when it was played, into a WAV
+  file, for tests
+
+Setting `MAZE_GITB_SOUND` to `openal`, `null` or the name of a `.wav`
+file to capture to picks one. Without it the game uses OpenAL, or nothing
+on a headless terminal. If OpenAL can't be loaded or has no device the
+game goes on without sound.
+
+Example:
+    ```
+    use_backend(WavCapture("sounds.wav"))
+    voice("sound/hit_wall.wav").play()
+    close_backend()
+    ```
+"""
+import logging
+import os
+import time
+import wave
+from typing import Callable, Dict, List, Optional, Protocol, Tuple
+
+import numpy as np
+
+from maze_gitb.core.terminal import HeadlessTerminal, current_terminal
+
+SOUND = "MAZE_GITB_SOUND"
+
+Position = Tuple[float, float, float]
+
+
+class Clip:
+    """The PCM samples of a WAV file"""
+
+    def __init__(self, name: str, data: bytes, channels: int, sample_width: int, rate: int) -> None:
+        self.name = name
+        self.data = data
+        self.channels = channels
+        self.sample_width = sample_width
+        self.rate = rate
+
+    @classmethod
+    def decode(cls, path: str) -> "Clip":
+        """Return the samples of the WAV file at path"""
+        with wave.open(path, "rb") as f:
+            return cls(
+                os.path.basename(path),
+                f.readframes(f.getnframes()),
+                f.getnchannels(),
+                f.getsampwidth(),
+                f.getframerate(),
+            )
+
+    @property
+    def duration(self) -> float:
+        """Return how long the clip plays, in seconds"""
+        return len(self.data) / (self.channels * self.sample_width * self.rate)
+
+    def mono(self) -> np.ndarray:
+        """Return the samples as floats from -1 to 1, the channels mixed"""
+        if self.sample_width == 1:
+            samples = (np.frombuffer(self.data, np.uint8).astype(np.float32) - 128) / 128
+        else:
+            samples = np.frombuffer(self.data, np.int16).astype(np.float32) / 32768
+        return samples.reshape(-1, self.channels).mean(axis=1)
+
+
+# path -> clip, decoded the first time it plays
+_clips: Dict[str, Clip] = {}
+
+
+def clip(path: str) -> Clip:
+    """Return the decoded WAV file at path, decoding it only once"""
+    decoded = _clips.get(path)
+    if decoded is None:
+        decoded = _clips[path] = Clip.decode(path)
+    return decoded
+
+
+class Voice(Protocol):
+    """A sound that can be played, the methods of an OpenAL source the game uses"""
+
+    def play(self) -> None:
+        """Play from the start, again if it is playing"""
+
+    def stop(self) -> None:
+        """Stop playing"""
+
+    def set_position(self, position: Position) -> None:
+        """Play from position, relative to the listener"""
+
+    def set_looping(self, looping: bool) -> None:
+        """Start again at the end, until stopped"""
+
+    def set_gain(self, gain: float) -> None:
+        """Play at gain times the volume of the clip"""
+
+
+class Backend(Protocol):
+    """What plays the sounds"""
+
+    def voice(self, clip: Clip) -> Voice:
+        """Return a new voice playing clip"""
+
+    def close(self) -> None:
+        """Stop everything and let go of the device"""
+
+
+class NullVoice:
+    """A voice that plays nothing"""
+
+    def play(self) -> None:
+        """Play nothing"""
+
+    def stop(self) -> None:
+        """Stop nothing"""
+
+    def set_position(self, position: Position) -> None:
+        """Ignore position"""
+
+    def set_looping(self, looping: bool) -> None:
+        """Ignore looping"""
+
+    def set_gain(self, gain: float) -> None:
+        """Ignore gain"""
+
+
+class NullBackend:
+    """Plays nothing, for games without a sound device"""
+
+    def voice(self, clip: Clip) -> Voice:
+        """Return a voice that plays nothing"""
+        return NullVoice()
+
+    def close(self) -> None:
+        """Nothing to close"""
+
+
+class OpenALBackend:
+    """Plays the sounds with OpenAL, each voice a source with its own buffer"""
+
+    def __init__(self) -> None:
+        # importing it fails without the OpenAL library
+        import openal
+
+        openal.oalInit()
+        self.openal = openal
+        self.formats = {
+            (1, 1): openal.AL_FORMAT_MONO8,
+            (1, 2): openal.AL_FORMAT_MONO16,
+            (2, 1): openal.AL_FORMAT_STEREO8,
+            (2, 2): openal.AL_FORMAT_STEREO16,
+        }
+
+    def voice(self, clip: Clip) -> Voice:
+        """Return a source playing clip"""
+        sample_format = self.formats[(clip.channels, clip.sample_width)]
+        buffer = self.openal.Buffer(sample_format, clip.data, len(clip.data), clip.rate)
+        return self.openal.Source(buffer, True)
+
+    def close(self) -> None:
+        """Destroy the sources and close the device"""
+        self.openal.oalQuit()
+
+
+class CaptureVoice:
+    """A voice that notes when it played, for `WavCapture`"""
+
+    def __init__(self, capture: "WavCapture", clip: Clip) -> None:
+        self.capture = capture
+        self.clip = clip
+        self.position: Position = (0.0, 0.0, 0.0)
+        self.looping = False
+        self.gain = 1.0
+        # when it started playing, None if it isn't
+        self.started: Optional[float] = None
+
+    def play(self) -> None:
+        """Note that the clip plays from now"""
+        self.stop()
+        self.started = self.capture.clock()
+        self.capture.played.append((self.started - self.capture.start, self.clip.name, self.position))
+
+    def stop(self) -> None:
+        """Mix what played since `play` into the capture"""
+        if self.started is not None:
+            self.capture.mix(self, self.capture.clock() - self.started)
+            self.started = None
+
+    def set_position(self, position: Position) -> None:
+        """Note position, the capture is mixed down to mono"""
+        self.position = position
+
+    def set_looping(self, looping: bool) -> None:
+        """Start again at the end, until stopped"""
+        self.looping = looping
+
+    def set_gain(self, gain: float) -> None:
+        """Play at gain times the volume of the clip"""
+        self.gain = gain
+
+
+class WavCapture:
+    """Mixes the sounds played into a mono WAV file, written on `close`.
+
+    `played` has the time, name and position of every sound played, in
+    seconds since the capture started. A sound plays until it is stopped,
+    it ends, or the capture is closed.
+    """
+
+    def __init__(self, path: str, rate: int = 44100, clock: Callable[[], float] = time.perf_counter) -> None:
+        self.path = path
+        self.rate = rate
+        self.clock = clock
+        self.start = clock()
+        self.played: List[Tuple[float, str, Position]] = []
+        self.voices: List[CaptureVoice] = []
+        # (first sample, samples) of everything played
+        self.parts: List[Tuple[int, np.ndarray]] = []
+        # clip -> its samples at the rate of the capture
+        self.resampled: Dict[Clip, np.ndarray] = {}
+
+    def voice(self, clip: Clip) -> Voice:
+        """Return a voice that is mixed into the capture"""
+        voice = CaptureVoice(self, clip)
+        self.voices.append(voice)
+        return voice
+
+    def mix(self, voice: CaptureVoice, duration: float) -> None:
+        """Add duration seconds of voice, from when it started playing"""
+        samples = self.resampled.get(voice.clip)
+        if samples is None:
+            mono = voice.clip.mono()
+            length = round(len(mono) * self.rate / voice.clip.rate)
+            samples = np.interp(np.linspace(0, len(mono) - 1, length), np.arange(len(mono)), mono)
+            self.resampled[voice.clip] = samples
+        length = round(duration * self.rate)
+        if voice.looping and len(samples):
+            samples = np.tile(samples, -(-length // len(samples)))
+        first = round((voice.started - self.start) * self.rate)
+        self.parts.append((first, samples[:length] * voice.gain))
+
+    def close(self) -> None:
+        """Stop every voice and write the mix"""
+        for voice in self.voices:
+            voice.stop()
+        end = max((first + len(samples) for first, samples in self.parts), default=0)
+        track = np.zeros(end, np.float32)
+        for first, samples in self.parts:
+            track[first:first + len(samples)] += samples
+        with wave.open(self.path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(self.rate)
+            f.writeframes((np.clip(track, -1, 1) * 32767).astype("<i2").tobytes())
+
+
+def backend_from_environ() -> Backend:
+    """Return the backend asked for by `MAZE_GITB_SOUND`, see the module docstring"""
+    name = os.environ.get(SOUND, "")
+    if name.lower().endswith(".wav"):
+        return WavCapture(name)
+    if name == "null" or (not name and isinstance(current_terminal(), HeadlessTerminal)):
+        return NullBackend()
+    if name not in ("", "openal"):
+        logging.error(RuntimeError(f"{SOUND} should be openal, null or a .wav file, not {name!r}"))
+    try:
+        return OpenALBackend()
+    except Exception as e:
+        logging.error(RuntimeError(f"Playing no sound, OpenAL couldn't start: {e}"))
+        return NullBackend()
+
+
+_backend: Optional[Backend] = None
+# path -> voice, made the first time it plays
+_voices: Dict[str, Voice] = {}
+
+
+def use_backend(backend: Backend) -> Backend:
+    """Play the sounds with backend from now on, and return it"""
+    close_backend()
+    global _backend
+    _backend = backend
+    return backend
+
+
+def get_backend() -> Backend:
+    """Return the backend playing the sounds, made the first time it is needed"""
+    global _backend
+    if _backend is None:
+        _backend = backend_from_environ()
+    return _backend
+
+
+def close_backend() -> None:
+    """Close the backend if it was made, the next sound makes a new one"""
+    global _backend
+    if _backend is not None:
+        _backend.close()
+    _backend = None
+    _voices.clear()
+
+
+def voice(path: str) -> Voice:
+    """Return the voice of the WAV file at path, loading it the first time.
+
+    A file that can't be loaded plays nothing.
+    """
+    found = _voices.get(path)
+    if found is None:
+        try:
+            found = get_backend().voice(clip(path))
+        except (OSError, EOFError, wave.Error) as e:
+            logging.error(RuntimeError(f"Can't load sound {path}: {e}"))
+            found = NullVoice()
+        _voices[path] = found
+    return found
@@ -1,10 +1,18 @@
-from blessed import Terminal
+import re
+from typing import Iterator, List, Tuple, Union
+
+import numpy as np
 
 from maze_gitb.core.render import Render
+from maze_gitb.core.session import SessionLocal
+from maze_gitb.core.terminal import get_terminal
 from maze_gitb.utils import Vec  # type: ignore
 
-render = Render()
-term = Terminal()
+render: Render = SessionLocal(Render)  # type: ignore
+term = get_terminal()
+
+# runs of characters that are drawn, blanks are left as they are on screen
+RUN = re.compile(r"[^ ]+")
 
 
 class AnimatedCharacter:
@@ -13,6 +21,8 @@ class AnimatedCharacter:
     https://www.figma.com/file/KOvD3LAhx8ljCyvNJB4X2e/Untitled?node-id=0%3A1
     """
 
+    __slots__ = ("char", "_location", "_col", "_is_visible")
+
     def __init__(
         self,
         char: str,
@@ -66,3 +76,87 @@ class AnimatedCharacter:
         """Set visibility of this character"""
         self._is_visible = val
         self.render()
+
+
+class CharRow:
+    """One row of a `CharMatrix`, creates characters when they are indexed."""
+
+    __slots__ = ("matrix", "y")
+
+    def __init__(self, matrix: "CharMatrix", y: int):
+        self.matrix = matrix
+        self.y = y
+
+    def __len__(self) -> int:
+        return self.matrix.glyphs.shape[1]
+
+    def __getitem__(self, x: int) -> AnimatedCharacter:
+        return self.matrix.char_at(x, self.y)
+
+    def __iter__(self) -> Iterator[AnimatedCharacter]:
+        return (self.matrix.char_at(x, self.y) for x in range(len(self)))
+
+
+class CharMatrix:
+    """Grid of characters stored as parallel arrays.
+
+    `glyphs` indexes `charset`, `colours` indexes `palette` and `walls` is True
+    where a character blocks the player. Indexing with `[y][x]` gives an
+    `AnimatedCharacter` located at `origin + (x, y)`, made only when asked for.
+    The text of each row is built the first time `runs` asks for it.
+    """
+
+    __slots__ = ("glyphs", "colours", "walls", "charset", "palette", "origin", "_runs")
+
+    def __init__(
+        self,
+        glyphs: np.ndarray,
+        colours: np.ndarray,
+        walls: np.ndarray,
+        charset: List[str],
+        palette: List[str],
+        origin: Vec = Vec(0, 0),
+    ):
+        self.glyphs = glyphs
+        self.colours = colours
+        self.walls = walls
+        self.charset = charset
+        self.palette = palette
+        self.origin = origin
+        self._runs: List[Tuple[List[int], List[str]]] = [None] * len(glyphs)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Get (height, width) of the grid"""
+        return self.glyphs.shape
+
+    def __len__(self) -> int:
+        return self.glyphs.shape[0]
+
+    def __getitem__(self, index: Union[int, Tuple[int, int]]) -> Union[CharRow, AnimatedCharacter]:
+        if isinstance(index, tuple):
+            y, x = index
+            return self.char_at(x, y)
+        return CharRow(self, index)
+
+    def __iter__(self) -> Iterator[CharRow]:
+        return (CharRow(self, y) for y in range(len(self)))
+
+    def char_at(self, x: int, y: int) -> AnimatedCharacter:
+        """Return the character at (x, y)"""
+        return AnimatedCharacter(
+            char=self.charset[self.glyphs[y, x]],
+            location=self.origin + Vec(x, y),
+            col=self.palette[self.colours[y, x]],
+        )
+
+    def runs(self, y: int) -> Tuple[List[int], List[str]]:
+        """Return the start columns and the text of the runs of non-blank characters in row y"""
+        if self._runs[y] is None:
+            row = "".join(self.charset[g] for g in self.glyphs[y].tolist())
+            matches = list(RUN.finditer(row))
+            self._runs[y] = ([m.start() for m in matches], [m.group() for m in matches])
+        return self._runs[y]
+
+    def __str__(self):
+        return "\n".join("".join(self.charset[g] for g in row) for row in self.glyphs.tolist()) + "\n"
@@ -0,0 +1,290 @@
+"""Maze generation algorithms working on a wall bitmask grid.
+
+Every generator returns a `(height, width)` array of `uint8` where each cell
+holds the walls that are still standing as a combination of the bits below.
+All of them build perfect mazes, they differ in texture and in speed:
+
+    backtracker  long winding corridors with few branches, fast
+    kruskal      many short dead ends, fast
+    prim         short dead ends radiating from the start, fast
+    eller        horizontal bias with vertical runs, fastest on wide mazes
+    wilson       unbiased (uniform spanning tree), slowest at the start
+"""
+import random
+from array import array
+from itertools import permutations
+from typing import Callable, Dict, List
+
+import numpy as np
+
+# Bit for each wall of a cell in the wall grid.
+N_WALL, S_WALL, W_WALL, E_WALL = 1, 2, 4, 8
+ALL_WALLS = N_WALL | S_WALL | W_WALL | E_WALL
+
+
+# Codes for the neighbour a cell was joined to the maze from, 0 means not visited yet.
+FROM_S, FROM_N, FROM_E, FROM_W, ROOT = 1, 2, 3, 4, 5
+
+
+def _padded_grid(width: int, height: int, border: int, fill: int = 0) -> bytearray:
+    """Return a flat grid filled with `fill` and a one cell border of `border`."""
+    stride = width + 2
+    grid = bytearray([border]) * (stride * (height + 2))
+    row = bytes([fill]) * width
+    for y in range(1, height + 1):
+        grid[y * stride + 1:y * stride + 1 + width] = row
+    return grid
+
+
+def _unpad(grid: bytearray, width: int, height: int) -> np.ndarray:
+    """Strip the border from a flat padded grid and return it as a 2D array."""
+    return np.frombuffer(grid, dtype=np.uint8).reshape(height + 2, width + 2)[1:-1, 1:-1]
+
+
+def walls_from_links(links: np.ndarray) -> np.ndarray:
+    """Knock down the wall between every cell and the cell it was entered from."""
+    walls = np.full(links.shape, ALL_WALLS, dtype=np.uint8)
+    entered = links == FROM_S
+    walls[entered] ^= S_WALL
+    walls[1:][entered[:-1]] ^= N_WALL
+    entered = links == FROM_N
+    walls[entered] ^= N_WALL
+    walls[:-1][entered[1:]] ^= S_WALL
+    entered = links == FROM_E
+    walls[entered] ^= E_WALL
+    walls[:, 1:][entered[:, :-1]] ^= W_WALL
+    entered = links == FROM_W
+    walls[entered] ^= W_WALL
+    walls[:, :-1][entered[:, 1:]] ^= E_WALL
+    return walls
+
+
+def walls_from_openings(east: np.ndarray, south: np.ndarray) -> np.ndarray:
+    """
+    Knock down walls given where cells open to their neighbours.
+
+    `east` has shape `(height, width - 1)` and `south` `(height - 1, width)`.
+    """
+    height, width = south.shape[0] + 1, east.shape[1] + 1
+    walls = np.full((height, width), ALL_WALLS, dtype=np.uint8)
+    walls[:, :-1][east] ^= E_WALL
+    walls[:, 1:][east] ^= W_WALL
+    walls[:-1][south] ^= S_WALL
+    walls[1:][south] ^= N_WALL
+    return walls
+
+
+def recursive_backtracker(width: int, height: int) -> np.ndarray:
+    """
+    Knocks down random walls with a random-walk depth first search.
+
+    Algorithm from http://mazeworks.com/mazegen/mazetut/index.htm
+    Every cell gets a random order in which it tries its neighbours, so each
+    of them is only looked at once. The walk only records where each cell was
+    entered from, the walls are knocked down afterwards in one go.
+    """
+    stride = width + 2
+    # the border is marked as visited so no bound checks are needed
+    links = _padded_grid(width, height, ROOT)
+    moves = ((-stride, FROM_S), (stride, FROM_N), (-1, FROM_E), (1, FROM_W))
+    orders = list(permutations(moves))
+    rng = np.random.default_rng(random.getrandbits(64))
+    order_of = rng.integers(0, len(orders), len(links)).tolist()
+    tried = bytearray(len(links))
+
+    stack = array("l", bytes(array("l").itemsize * width * height))
+    size = 0
+    cell = (random.randrange(height) + 1) * stride + random.randrange(width) + 1
+    links[cell] = ROOT
+
+    while True:
+        order = orders[order_of[cell]]
+        i = tried[cell]
+        while i < 4:
+            step, entered_from = order[i]
+            i += 1
+            if not links[cell + step]:
+                tried[cell] = i
+                stack[size] = cell
+                size += 1
+                cell += step
+                links[cell] = entered_from
+                break
+        else:
+            if not size:
+                break
+            size -= 1
+            cell = stack[size]
+
+    return walls_from_links(_unpad(links, width, height))
+
+
+def kruskal(width: int, height: int) -> np.ndarray:
+    """
+    Knocks down walls in random order unless it would create a loop.
+
+    Randomized Kruskal with a flat union-find array using path halving.
+    Every inner wall is looked at once, O(cells * α(cells)).
+    """
+    east_count = height * (width - 1)
+    edges = np.random.default_rng(random.getrandbits(64)).permutation(
+        east_count + (height - 1) * width
+    ).tolist()
+    parent = list(range(width * height))
+    opened = bytearray(len(edges))
+    joins = width * height - 1
+
+    for edge in edges:
+        if edge < east_count:
+            a = edge // (width - 1) * width + edge % (width - 1)
+            b = a + 1
+        else:
+            a = edge - east_count
+            b = a + width
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        while parent[b] != b:
+            parent[b] = parent[parent[b]]
+            b = parent[b]
+        if a != b:
+            parent[b] = a
+            opened[edge] = 1
+            joins -= 1
+            if not joins:
+                break
+
+    opened = np.frombuffer(opened, dtype=bool)
+    return walls_from_openings(
+        opened[:east_count].reshape(height, width - 1),
+        opened[east_count:].reshape(height - 1, width),
+    )
+
+
+def prim(width: int, height: int) -> np.ndarray:
+    """
+    Grows the maze from a random cell by joining random frontier cells.
+
+    Randomized Prim with the frontier kept in an array where a picked cell
+    is swapped with the last one, so picking is O(1) and the maze is O(cells).
+    """
+    stride = width + 2
+    links = _padded_grid(width, height, ROOT)
+    inside = _padded_grid(width, height, 0, 1)
+    in_frontier = bytearray(len(links))
+    moves = ((-stride, FROM_N), (stride, FROM_S), (-1, FROM_W), (1, FROM_E))
+    frontier = array("l", bytes(array("l").itemsize * width * height))
+    size = 0
+    rand = random.random
+
+    cell = (random.randrange(height) + 1) * stride + random.randrange(width) + 1
+    links[cell] = ROOT
+    while True:
+        for step, _ in moves:
+            if not links[cell + step] and not in_frontier[cell + step]:
+                in_frontier[cell + step] = 1
+                frontier[size] = cell + step
+                size += 1
+        if not size:
+            break
+        i = int(rand() * size)
+        cell = frontier[i]
+        size -= 1
+        frontier[i] = frontier[size]
+        # join to a random neighbour that is already part of the maze
+        options = [link for step, link in moves if links[cell + step] and inside[cell + step]]
+        links[cell] = options[int(rand() * len(options))]
+
+    return walls_from_links(_unpad(links, width, height))
+
+
+def wilson(width: int, height: int) -> np.ndarray:
+    """
+    Adds loop-erased random walks to the maze until it covers the grid.
+
+    Wilson's algorithm gives every perfect maze the same probability. The
+    walk only remembers the last way out of each cell, which erases loops.
+    The first walks are long, expected O(cells * log(cells)) steps overall.
+    """
+    stride = width + 2
+    inside = _padded_grid(width, height, 0, 1)
+    links = _padded_grid(width, height, ROOT)
+    moves = ((-stride, FROM_N), (stride, FROM_S), (-1, FROM_W), (1, FROM_E))
+    exit_of = bytearray(len(links))
+    rand = random.random
+
+    cells = [(y + 1) * stride + x + 1 for y in range(height) for x in range(width)]
+    random.shuffle(cells)
+    links[cells[0]] = ROOT
+    for start in cells[1:]:
+        cell = start
+        while not links[cell]:
+            i = int(rand() * 4)
+            while not inside[cell + moves[i][0]]:
+                i = int(rand() * 4)
+            exit_of[cell] = i
+            cell += moves[i][0]
+        cell = start
+        while not links[cell]:
+            step, link = moves[exit_of[cell]]
+            links[cell] = link
+            cell += step
+
+    return walls_from_links(_unpad(links, width, height))
+
+
+def eller(width: int, height: int) -> np.ndarray:
+    """
+    Builds the maze one row at a time keeping only the current row's sets.
+
+    Cells in a row are randomly joined to the east when they are in different
+    sets, then every set opens at least once to the south. The last row joins
+    all remaining sets. Sets are a union-find array, O(cells * α(cells)).
+    """
+    east = np.zeros((height, width - 1), dtype=bool)
+    south = np.zeros((height - 1, width), dtype=bool)
+    parent = list(range(width))
+    row = list(range(width))
+    rand = random.random
+
+    def find(a: int) -> int:
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    for y in range(height):
+        last = y == height - 1
+        for x in range(width - 1):
+            a, b = find(row[x]), find(row[x + 1])
+            if a != b and (last or rand() < 0.5):
+                parent[b] = a
+                east[y, x] = True
+        if last:
+            break
+
+        members: Dict[int, List[int]] = {}
+        for x in range(width):
+            members.setdefault(find(row[x]), []).append(x)
+        next_row = [-1] * width
+        for root, xs in members.items():
+            down = [x for x in xs if rand() < 0.5] or [xs[int(rand() * len(xs))]]
+            for x in down:
+                south[y, x] = True
+                next_row[x] = root
+        for x in range(width):
+            if next_row[x] < 0:
+                next_row[x] = len(parent)
+                parent.append(len(parent))
+        row = next_row
+
+    return walls_from_openings(east, south)
+
+
+GENERATORS: Dict[str, Callable[[int, int], np.ndarray]] = {
+    "backtracker": recursive_backtracker,
+    "kruskal": kruskal,
+    "prim": prim,
+    "eller": eller,
+    "wilson": wilson,
+}
@@ -0,0 +1,118 @@
+"""Stand-in for the terminal screen when there is none.
+
+`HeadlessDisplay` takes the frames the game writes, like `FrameWriter`, and
+keeps the screen they would show in a `Screen`. It can take a `Snapshot` of
+that screen after any frame to compare with another run, and measures what
+every frame cost.
+
+Example:
+    ```
+    from maze_gitb.core.terminal import use_headless
+
+    term = use_headless(120, 40)
+    # import the game modules only now
+    display = HeadlessDisplay(term.width, term.height)
+    level.next_frame(Keystroke())
+    display.write(render.screen())
+    assert display.snapshot() == expected
+    ```
+"""
+import hashlib
+import time
+from typing import Callable, List
+
+from maze_gitb.core.screen import Screen
+
+
+class Snapshot:
+    """What the screen showed at one moment, snapshots of the same screen are equal."""
+
+    __slots__ = ("lines", "styles")
+
+    def __init__(self, screen: Screen):
+        self.lines = ["".join(glyphs) for glyphs in screen.glyphs]
+        self.styles = [tuple(styles) for styles in screen.styles]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Snapshot):
+            return NotImplemented
+        return self.lines == other.lines and self.styles == other.styles
+
+    def __str__(self):
+        return "\n".join(self.lines)
+
+    def digest(self) -> str:
+        """Return a short hash of the text and the colours, to store instead of the snapshot"""
+        data = "\n".join(self.lines + ["".join(styles) for styles in self.styles])
+        return hashlib.blake2b(data.encode(), digest_size=8).hexdigest()
+
+    def diff(self, other: "Snapshot") -> List[str]:
+        """Return a description of every row that differs from other"""
+        return [
+            f"row {y}: {line!r} != {other_line!r}" if line != other_line else f"row {y}: colours differ"
+            for y, (line, other_line, styles, other_styles) in enumerate(
+                zip(self.lines, other.lines, self.styles, other.styles)
+            )
+            if line != other_line or styles != other_styles
+        ]
+
+
+class HeadlessDisplay:
+    """Screen the frames are written to when there is no terminal.
+
+    The cost of a frame is the time since the previous write returned, that
+    is how long the game took to make it when frames are made back to back.
+    """
+
+    def __init__(
+        self, width: int, height: int, encoding: str = "utf-8", clock: Callable[[], float] = time.perf_counter
+    ) -> None:
+        self.screen = Screen(width, height, blank=" ")
+        self.encoding = encoding
+        self.clock = clock
+        # bytes and seconds of every frame written
+        self.sizes: List[int] = []
+        self.costs: List[float] = []
+        self.last = clock()
+
+    @property
+    def frames(self) -> int:
+        """Get the number of frames written"""
+        return len(self.sizes)
+
+    @property
+    def bytes(self) -> int:
+        """Get the number of bytes written"""
+        return sum(self.sizes)
+
+    def write(self, frame: str) -> int:
+        """Show frame on the screen and return its size in bytes, empty frames are skipped"""
+        cost = self.clock() - self.last
+        if not frame:
+            self.last = self.clock()
+            return 0
+        size = len(frame.encode(self.encoding))
+        self.screen.feed(frame)
+        # nothing reads the sequences the model doesn't follow
+        self.screen.passthrough = []
+        self.sizes.append(size)
+        self.costs.append(cost)
+        self.last = self.clock()
+        return size
+
+    def resize(self, width: int, height: int) -> None:
+        """Change the size of the screen, it is blank until the next frame draws on it"""
+        self.screen = Screen(width, height, blank=" ")
+
+    def snapshot(self) -> Snapshot:
+        """Return what the screen shows now"""
+        return Snapshot(self.screen)
+
+    def report(self) -> str:
+        """Return frame statistics"""
+        if not self.sizes:
+            return "wrote no frames"
+        return (
+            f"wrote {self.frames} frames, {self.bytes} bytes, {self.bytes / self.frames:.0f} per frame, "
+            f"cost mean {sum(self.costs) / self.frames * 1e3:.2f} ms max {max(self.costs) * 1e3:.2f} ms"
+        )
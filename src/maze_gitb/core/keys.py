@@ -0,0 +1,77 @@
+"""The keys pressed between two frames, played together.
+
+The game takes all the keys that came in since the last frame at once, so
+keys that pile up while a frame is slow don't play one frame each long
+after they were pressed. `KeyRepeat` then drops the presses of an arrow
+key in a row past a limit, which is what holding it down sends, and
+levels move the player with all the arrows left before drawing once.
+
+Setting `MAZE_GITB_KEY_REPEAT` to a number changes the limit, `0` plays
+every press.
+"""
+import logging
+import os
+from typing import List, Optional
+
+from blessed.keyboard import Keystroke
+
+KEY_REPEAT = "MAZE_GITB_KEY_REPEAT"
+
+
+def is_move(val: Keystroke) -> bool:
+    """Return True if val is an arrow key"""
+    return val.is_sequence and (257 < val.code < 262)
+
+
+class KeyRepeat:
+    """How many presses in a row of one arrow key a frame plays.
+
+    Key repeat sends 20 to 30 presses a second, a frame at 20 ticks a
+    second gets one or two of them. Any more piled up while the game was
+    behind, and playing them would move the player on after the key was
+    let go. `limit` of None plays every press.
+
+    Example:
+        ```
+        KeyRepeat(2).coalesce([right, right, right, up, up])  # [right, right, up, up]
+        ```
+    """
+
+    def __init__(self, limit: Optional[int] = 2) -> None:
+        self.limit = limit
+        # presses dropped so far
+        self.dropped = 0
+
+    @classmethod
+    def from_environ(cls) -> "KeyRepeat":
+        """Return the policy asked for by `MAZE_GITB_KEY_REPEAT`"""
+        value = os.environ.get(KEY_REPEAT)
+        if not value:
+            return cls()
+        try:
+            limit = int(value)
+        except ValueError:
+            logging.error(RuntimeError(f"{KEY_REPEAT} should be a number, not {value!r}"))
+            return cls()
+        return cls(limit if limit > 0 else None)
+
+    def coalesce(self, vals: List[Keystroke]) -> List[Keystroke]:
+        """Return vals without the presses of an arrow key past the limit in a row"""
+        if self.limit is None or len(vals) <= self.limit:
+            return vals
+        kept: List[Keystroke] = []
+        run = 0
+        for val in vals:
+            if kept and is_move(val) and val.code == kept[-1].code:
+                run += 1
+            else:
+                run = 1
+            if run <= self.limit:
+                kept.append(val)
+        self.dropped += len(vals) - len(kept)
+        return kept
+
+    def report(self) -> str:
+        """Return how many presses were dropped"""
+        limit = "no limit" if self.limit is None else f"at most {self.limit} in a row"
+        return f"key repeat, {limit}: dropped {self.dropped} presses"
@@ -1,33 +1,52 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import os
 import random
 import sys
+import threading
+from collections import OrderedDict
 from copy import copy
 from pathlib import Path
 from typing import TYPE_CHECKING, Dict, Iterator, List, Tuple
 
-import blessed
 import numpy as np
 
-from maze_gitb.core.character import AnimatedCharacter
+from maze_gitb.core.character import RUN, AnimatedCharacter, CharMatrix
+from maze_gitb.core.generators import (
+    ALL_WALLS, E_WALL, GENERATORS, N_WALL, S_WALL, W_WALL
+)
 from maze_gitb.core.render import Render
-from maze_gitb.utils import Vec, points_in_circle_np  # type: ignore
+from maze_gitb.core.session import SessionLocal
+from maze_gitb.core.terminal import (
+    current_terminal, cursor_moves, get_terminal
+)
+from maze_gitb.utils import (  # type: ignore
+    Vec, bfs_distances, circle_points, wall_distances
+)
 
 if TYPE_CHECKING:
     from maze_gitb.core.player import Player
 
-render = Render()
+render: Render = SessionLocal(Render)  # type: ignore
 
 # Easy to read representation for each cardinal direction.
 N, S, W, E = ("n", "s", "w", "e")
+WALL_BITS = {N: N_WALL, S: S_WALL, W: W_WALL, E: E_WALL}
 TARGET = 4
 PLAYER = 3
 AIR = 0
 
-term = blessed.Terminal()
+term = get_terminal()
+
+OVERLAY_CACHE_SIZE = 256
+# (terminal kind, top left corner, shape, digest of the walls) -> (map, erase map), boxes showing the same
+# part of a maze and the levels of every session on the same kind of terminal share them
+_overlays: "OrderedDict[tuple, Tuple[str, str]]" = OrderedDict()
+# sessions build their mazes on another thread, see `maze_gitb.core.session.build_in_thread`
+_overlays_lock = threading.Lock()
 
 
 class Cell(object):
@@ -73,6 +92,38 @@ class Cell(object):
         self.walls.remove(self._wall_to(other))
 
 
+def _glyphs_by_wall_bits(by_connections: Dict[str, str]) -> List[str]:
+    """Return a list of 16 characters where the index is the wall bits of the connections."""
+    return [
+        by_connections.get("".join(sorted(d for d, bit in WALL_BITS.items() if bits & bit)), " ")
+        for bits in range(16)
+    ]
+
+
+def encode_map(lines: List[str], top_left: Vec) -> Tuple[str, str]:
+    """Return frames drawing and erasing the non-blank characters of lines, starting at top_left.
+
+    Blank cells are skipped, not drawn, with whichever of `move_right` and
+    `move_xy` is shorter. Both frames are built in the same pass.
+    """
+    moves = cursor_moves()
+    frame: List[str] = []
+    erase: List[str] = []
+    cursor: Vec = None
+    for y, line in enumerate(lines, top_left.y):
+        for run in RUN.finditer(line):
+            x = top_left.x + run.start()
+            move = moves.move_xy(x, y)
+            if cursor is not None and cursor.y == y:
+                right = moves.move_right(x - cursor.x)
+                if len(right) < len(move):
+                    move = right
+            frame.append(move + run.group())
+            erase.append(move + " " * len(run.group()))
+            cursor = Vec(top_left.x + run.end(), y)
+    return "".join(frame), "".join(erase)
+
+
 class Maze(object):
     """Maze class containing full board and maze generation algorithms."""
 
@@ -100,25 +151,52 @@ class Maze(object):
         for key, val in _UNICODE_BY_CONNECTIONS.items()
     }
 
+    # The same characters indexed by the wall bits of the connected walls.
+    GLYPHS: List[str] = _glyphs_by_wall_bits(_UNICODE_BY_CONNECTIONS)
+    GLYPH_CODES = np.array([ord(char) for char in GLYPHS], dtype=np.uint32)
+    PALETTE: List[str] = ["webgreen", "black"]
+
     def __init__(self, width: int = 20, height: int = 10):
         """Creates a new maze with the given sizes, with all walls standing."""
         self.width = width
         self.height = height
-        self.cells = []
-        for y in range(self.height):
-            for x in range(self.width):
-                self.cells.append(Cell(x, y, [N, S, E, W]))
+        self.walls = np.full((self.height, self.width), ALL_WALLS, dtype=np.uint8)
+        self._cells: List[Cell] = None
         self.matrix = self.to_np_matrix()
-        self.char_matrix: List[List[AnimatedCharacter]] = [[]]
+        self.char_matrix: CharMatrix = None
+        # (char matrix, distances to the nearest wall per direction), rebuilt with the char matrix
+        self._wall_distances: Tuple[CharMatrix, Dict[Tuple[int, int], np.ndarray]] = None
         self.boxes: List[Box] = []
         self.start: Vec = None
         self.end: Vec = None
-        self.min_distance = np.linalg.norm(self.height - self.width * 1.5)
+        # the end is at least this far along the path, as a percentile of all distances
+        self.end_percentile = 75
 
         self.map: str = None
         self.erase_map: str = None
         self.top_left_corner: Vec = None
 
+    @property
+    def cells(self) -> List[Cell]:
+        """Cell objects for every position, built from the wall grid on first use."""
+        if self._cells is None:
+            self._cells = [
+                Cell(x, y, [d for d, bit in WALL_BITS.items() if walls & bit])
+                for y, row in enumerate(self.walls.tolist())
+                for x, walls in enumerate(row)
+            ]
+        return self._cells
+
+    @cells.setter
+    def cells(self, cells: List[Cell]) -> None:
+        """Replace the cell view, the wall grid is synced from it on `to_np_matrix`."""
+        self._cells = cells
+
+    def _sync_walls_from_cells(self) -> None:
+        """Copy walls changed through the cell view back into the wall grid."""
+        for cell in self._cells:
+            self.walls[cell.y, cell.x] = sum(WALL_BITS[d] for d in cell.walls)
+
     def __getitem__(self, index: Tuple[int, int]):
         """Returns the cell at index = (x, y)."""
         x, y = index
@@ -135,6 +213,16 @@ class Maze(object):
         """Convert matrix location of a point to screen location"""
         return self.top_left_corner + Vec(mat[1], mat[0]) * (2, 1)
 
+    def wall_distance(self, screen: Vec, direction: Vec) -> int:
+        """Return the signed number of screen cells from `screen` to the nearest wall in `direction`"""
+        if self._wall_distances is None or self._wall_distances[0] is not self.char_matrix:
+            self._wall_distances = (self.char_matrix, wall_distances(self.char_matrix.walls))
+        x, y = screen - self.char_matrix.origin
+        height, width = self.char_matrix.shape
+        if not (0 <= x < width and 0 <= y < height):
+            return 0
+        return int(self._wall_distances[1][direction][y, x])
+
     def neighbors(self, cell: Cell) -> Iterator[Cell]:
         """
         Returns the list of neighboring cells, not counting diagonals.
@@ -149,22 +237,20 @@ class Maze(object):
                 yield neighbor
 
     def to_np_matrix(self) -> np.ndarray:
-        """Returns a matrix with a pretty printed visual representation of this maze."""
-        str_matrix = np.array(
-            [[1] * (self.width * 2 + 1) for i in range(self.height * 2 + 1)]
-        )
-        for cell in self.cells:
-            x = cell.x * 2 + 1
-            y = cell.y * 2 + 1
-            str_matrix[y][x] = 0
-            if N not in cell and y > 0:
-                str_matrix[y - 1][x + 0] = 0
-            if S not in cell and y + 1 < self.width:
-                str_matrix[y + 1][x + 0] = 0
-            if W not in cell and x > 0:
-                str_matrix[y][x - 1] = 0
-            if E not in cell and x + 1 < self.width:
-                str_matrix[y][x + 1] = 0
+        """
+        Returns a matrix with a pretty printed visual representation of this maze.
+
+        Cell `(x, y)` is at `[2y + 1, 2x + 1]`, the pixels between two cells are
+        open unless both cells still have their wall there. The outer walls
+        are always closed.
+        """
+        if self._cells is not None:
+            self._sync_walls_from_cells()
+        walls = self.walls
+        str_matrix = np.ones((self.height * 2 + 1, self.width * 2 + 1), dtype=np.uint8)
+        str_matrix[1::2, 1::2] = 0
+        str_matrix[1::2, 2:-1:2] = ((walls[:, :-1] & E_WALL) > 0) & ((walls[:, 1:] & W_WALL) > 0)
+        str_matrix[2:-1:2, 1::2] = ((walls[:-1] & S_WALL) > 0) & ((walls[1:] & N_WALL) > 0)
 
         self.matrix = str_matrix
         return str_matrix
@@ -189,140 +275,94 @@ class Maze(object):
         # Starts with regular representation. Looks stretched because chars are
         # twice as high as they are wide (look at docs example in
         # `Maze._to_str_matrix`).
-        skinny_matrix = self.matrix
-
-        # Simply duplicate each character in each line.
-        double_wide_matrix = []
-        for line in skinny_matrix:
-            double_wide_matrix.append([])
-            for item in line:
-                char = "O" if item == 1 else " "
-                double_wide_matrix[-1].append(char)
-                double_wide_matrix[-1].append(char)
-
-        # The last two chars of each line are walls, and we will need only one.
-        # So we remove the last char of each line.
-        matrix = [line[:-1] for line in double_wide_matrix]
-
-        def wall_at(x: int, y: int) -> bool:
-            """Return True if there is a wall at (x, y). Values outside the valid range always return False."""
-            if 0 <= x < len(matrix[0]) and 0 <= y < len(matrix):
-                return str(matrix[y][x]) != " "
-            else:
-                return False
-
-        # Fix double wide walls, finally giving the impression of a symmetric
-        # maze.
-        for y, line in enumerate(matrix):
-            for x, char in enumerate(line):
-                if not wall_at(x, y) and wall_at(x - 1, y):
-                    matrix[y][x - 1] = " "
-
-        # Right now the maze has the correct aspect ratio, but is still using
-        # 'O' to represent walls.
-
-        # Finally we replace the walls with Unicode characters depending on
-        # their context.
-        for y, line in enumerate(matrix):
-            for x, char in enumerate(line):
-                if not wall_at(x, y):
-                    matrix[y][x] = AnimatedCharacter(char=" ", col="webgreen")
-                    continue
-
-                connections = {N, S, E, W}
-                if not wall_at(x, y + 1):
-                    connections.remove(S)
-                if not wall_at(x, y - 1):
-                    connections.remove(N)
-                if not wall_at(x + 1, y):
-                    connections.remove(E)
-                if not wall_at(x - 1, y):
-                    connections.remove(W)
-
-                str_connections = "".join(sorted(connections))
-                # Note we are changing the matrix we are reading. We need to be
-                # careful as to not break the `wall_at` function implementation
-                if str_connections != "":
-                    matrix[y][x] = copy(Maze.UNICODE_BY_CONNECTIONS[str_connections])
-                elif str_connections == "":
-                    matrix[y][x] = AnimatedCharacter(" ")
-                # print(type(matrix[y][x]))
-                # print(type(Maze.UNICODE_BY_CONNECTIONS[str_connections]))
-
-        # Simple double join to transform list of lists into string.
-        self.char_matrix = matrix
-        return "\n".join("".join(str(c) for c in line) for line in matrix) + "\n"
-
-    def randomize(self) -> None:
+        skinny_matrix = self.matrix == 1
+
+        # Duplicate each character in each line, except that the last column
+        # is only needed once. A duplicated wall only stays if the next
+        # column is a wall too, giving the impression of a symmetric maze.
+        height, width = skinny_matrix.shape
+        wall = np.zeros((height, 2 * width - 1), dtype=bool)
+        wall[:, 0::2] = skinny_matrix
+        wall[:, 1::2] = skinny_matrix[:, :-1] & skinny_matrix[:, 1:]
+
+        # Every wall gets a Unicode character depending on which of its
+        # neighbours are walls too.
+        bits = wall.view(np.uint8)
+        connections = np.zeros(wall.shape, dtype=np.uint8)
+        connections[1:] |= bits[:-1] * N_WALL
+        connections[:-1] |= bits[1:] * S_WALL
+        connections[:, 1:] |= bits[:, :-1] * W_WALL
+        connections[:, :-1] |= bits[:, 1:] * E_WALL
+        connections *= bits
+
+        # One extra column of line breaks turns the whole grid into a single string.
+        codes = np.full((height, wall.shape[1] + 1), ord("\n"), dtype=np.uint32)
+        codes[:, :-1] = Maze.GLYPH_CODES[connections]
+
+        # walls without connections are blank, they used to be black
+        self.char_matrix = CharMatrix(
+            glyphs=connections,
+            colours=(wall & (connections == 0)).view(np.uint8),
+            walls=connections > 0,
+            charset=Maze.GLYPHS,
+            palette=Maze.PALETTE,
+            origin=self.top_left_corner or Vec(0, 0),
+        )
+        return codes.tobytes().decode("utf-32")
+
+    def randomize(self, algorithm: str = "backtracker") -> None:
         """
         Knocks down random walls to build a random perfect maze.
 
-        Algorithm from http://mazeworks.com/mazegen/mazetut/index.htm
-        (The website is currently down)
+        `algorithm` is one of `maze_gitb.core.generators.GENERATORS`.
         """
-        cell_stack = []
-        cell = random.choice(self.cells)
-        n_visited_cells = 1
-
-        while n_visited_cells < len(self.cells):
-            neighbors = [c for c in self.neighbors(cell) if c.is_full()]
-            if len(neighbors):
-                neighbor = random.choice(neighbors)
-                cell.connect(neighbor)
-                cell_stack.append(cell)
-                cell = neighbor
-                n_visited_cells += 1
-            else:
-                cell = cell_stack.pop()
+        if algorithm not in GENERATORS:
+            raise ValueError(f"Unknown maze algorithm {algorithm!r}, choose from {', '.join(GENERATORS)}")
+        self.walls = GENERATORS[algorithm](self.width, self.height)
+        self._cells = None
         self.matrix = self.to_np_matrix()
 
-    def _get_random_position(self) -> Tuple[int, int]:
-        """Returns a random position on the maze."""
-        return random.randrange(0, self.height), random.randrange(0, self.width * 2)
+    @staticmethod
+    def _random_position(mask: np.ndarray) -> Vec:
+        """Returns a random (row, column) where `mask` is True."""
+        rows, columns = np.nonzero(mask)
+        i = random.randrange(len(rows))
+        return Vec(rows[i], columns[i])
 
     def get_random_start_end_position(self, random_pos: bool = False) -> None:
-        """Return a array with start and end position"""
-
-        def check() -> bool:
-            """Return whether the player and target location are valid"""
-            if (
-                self.start is None
-                or all(self.start == self.end)
-                or self.end is None
-                or self.matrix[self.start.x][self.start.y] != AIR
-                or self.matrix[self.end.x][self.end.y] != AIR
-            ):
-                return False
-            else:
-                distance = np.linalg.norm(self.start - self.end)
-                if distance < self.min_distance:
-                    return False
-                return True
+        """
+        Set start and end position as (row, column) of the matrix.
 
+        With `random_pos` the start is anywhere and the end is drawn from the
+        positions whose walking distance from the start is in the top
+        `100 - end_percentile` percent. Otherwise the start is on the left
+        edge and the end on the right edge. Both take O(cells).
+        """
+        air = self.matrix == AIR
         if random_pos:
-            while not check():
-                self.start = Vec(*self._get_random_position())
-                self.end = Vec(*self._get_random_position())
-            logging.debug(f"starting pos: {self.start} {self.end}")
+            self.start = self._random_position(air)
+            distances = bfs_distances(air, self.start)
+            threshold = np.percentile(distances[distances >= 0], self.end_percentile)
+            self.end = self._random_position(distances >= min(max(threshold, 1), distances.max()))
+            logging.debug(f"starting pos: {self.start} {self.end} {distances[self.end]} steps apart")
         else:
-            while self.start is None or self.matrix[self.start.x][self.start.y] != AIR:
-                self.start = Vec(random.randrange(0, self.height), 1)
-            while self.end is None or self.matrix[self.end.x][self.end.y] != AIR:
-                self.end = Vec(random.randrange(0, self.height), self.width - 1)
-            self.end = (self.end + 1) * 2 - 1
+            edge = np.zeros_like(air)
+            edge[:, 1] = air[:, 1]
+            self.start = self._random_position(edge)
+            self.end = Vec(random.randrange(0, self.height) * 2 + 1, self.width * 2 - 1)
 
     @classmethod
-    def generate(cls, width: int = 20, height: int = 10, *, random_pos: bool):
+    def generate(cls, width: int = 20, height: int = 10, *, random_pos: bool, algorithm: str = "backtracker"):
         """Returns a new random perfect maze with the given sizes."""
         obj = cls(width, height)
-        obj.randomize()
+        obj.randomize(algorithm)
         obj.set_erase_map()
         obj.get_random_start_end_position(random_pos)
         return obj
 
     def set_map(self, m: List[List[int]]) -> None:
         """Set map for the maze"""
-        self.matrix = np.array(m)
+        self.matrix = np.array(m, dtype=np.uint8)
         self.width = self.matrix.shape[0] // 2
         self.height = self.matrix.shape[1] // 2
 
@@ -331,24 +371,23 @@ class Maze(object):
         maze = str(self).split("\n")
         maze_shape = Vec(len(maze[0]), len(maze))
         self.set_top_left_corner(maze_shape)
-        new_line = term.move_left(maze_shape.x) + term.move_down(1)
-        maze = new_line.join(maze)  # type: ignore
-        maze = maze.replace(" ", term.move_right(1))  # type: ignore
-        self.map = term.move_xy(*self.top_left_corner) + maze  # type: ignore
-        for y, line in enumerate(self.char_matrix):
-            for x, char in enumerate(line):
-                char._location = self.top_left_corner + Vec(x, y)
-
-        erase_map = self.map
-        for chr in "┼├┴┬┌└─╶┤│┘┐╷╵╴":
-            if chr in erase_map:
-                erase_map = erase_map.replace(chr, " ")
-        self.erase_map = erase_map
+        self.set_maps(maze)
+
+    def set_maps(self, maze: List[str]) -> None:
+        """Set map and erase map drawing the lines of maze at the top left corner"""
+        self.map, self.erase_map = encode_map(maze, self.top_left_corner)
+        self.char_matrix.origin = self.top_left_corner
+        logging.debug(
+            f"map of {len(maze[0])}x{len(maze)} encoded in {len(self.map)} characters, "
+            f"{len(self.erase_map)} to erase it"
+        )
 
     def set_top_left_corner(self, maze_shape: Vec) -> None:
-        """Set location of the top left corner"""
+        """Set location of the top left corner, centred on the terminal if the maze fits"""
         terminal_shape = Vec(term.width, term.height)
-        self.top_left_corner = (terminal_shape - maze_shape) // 2
+        x, y = (terminal_shape - maze_shape) // 2
+        # bigger mazes start at the top left, the camera shows the rest
+        self.top_left_corner = Vec(max(x, 0), max(y, 0))
 
     @classmethod
     def load(cls, fname: str = "", data: dict = None) -> Maze:
@@ -372,7 +411,9 @@ class Maze(object):
         if end:
             obj.end = obj.mat2screen(end)
 
-        obj.set_erase_map()
+        # every session loads the same levels, they share the maps
+        share_maps(obj)
+        obj.char_matrix.origin = obj.top_left_corner
         for color, box_dict in data.items():
             obj.boxes.append(Box.load_from_dict(data=box_dict, col=color))
 
@@ -401,8 +442,36 @@ class Maze(object):
         return map_name
 
 
+def share_maps(maze: Maze) -> None:
+    """Set the map and erase map of maze, built once for all mazes with the same walls at the same place.
+
+    The maps move the cursor with the sequences of the terminal of the
+    session, so only terminals of the same kind share them.
+    """
+    digest = hashlib.blake2b(maze.matrix.tobytes(), digest_size=16).digest()
+    key = (current_terminal().kind, maze.top_left_corner, maze.matrix.shape, digest)
+    with _overlays_lock:
+        maps = _overlays.get(key)
+        if maps is not None:
+            _overlays.move_to_end(key)
+    if maps is None:
+        if maze.map is None:
+            maze.set_maps(str(maze).split("\n"))
+        maps = (maze.map, maze.erase_map)
+        with _overlays_lock:
+            _overlays[key] = maps
+            if len(_overlays) > OVERLAY_CACHE_SIZE:
+                _overlays.popitem(last=False)
+    maze.map, maze.erase_map = maps
+
+
 class Box:
-    """Box where parts of maze become visible."""
+    """Box where parts of maze become visible.
+
+    The maze is drawn once when the player steps in and erased once when
+    they step out. A scene that clears the screen sets `needs_cleaning`
+    to False, so the maze is drawn again if the player is still inside.
+    """
 
     def __init__(
         self,
@@ -431,27 +500,34 @@ class Box:
         render(frame, col=self.col)
 
     def show_maze(self, player: Player) -> str:
-        """Return associated maze if it should be shown"""
-        self.player_inside = False
-
-        self.player_inside = all(self.loc + (1, 1) == player.avi.coords)
-
-        # note if player is inside some box for scoring
-        player.inside_box[self.col] = self.player_inside
-        # if player enters inside, play sound etc
-        if self.player_inside:
-            player.enter_box()
+        """Return associated maze if it should be shown, or the frame erasing it once the player left"""
+        inside = self.player_in_box(player)
+        if inside != self.player_inside:
+            self.player_inside = inside
+            # note if player is inside some box for scoring
+            player.inside_box[self.col] = inside
+            # if player enters inside, play sound etc
+            if inside:
+                player.enter_box()
+
+        if inside and not self.needs_cleaning:
             self.needs_cleaning = True
             return self.maze.map
-        elif self.needs_cleaning:
+        elif not inside and self.needs_cleaning:
             self.needs_cleaning = False
             return self.maze.erase_map
         else:
             return ""
 
+    def leave(self, player: Player) -> None:
+        """Forget the player was inside, when the level starts over"""
+        self.player_inside = False
+        self.needs_cleaning = False
+        player.inside_box[self.col] = False
+
     def player_in_box(self, player: Player) -> bool:
         """Return True if player in box"""
-        return all(self.loc + (1, 1) == player.avi.coords)
+        return self.loc + (1, 1) == player.avi.coords
 
     @classmethod
     def load_from_dict(cls, data: dict, col: str) -> Box:
@@ -471,34 +547,35 @@ class Box:
         return obj
 
     def generate_map(self, maze: Maze, radius: int) -> None:
-        """Generate the map of the box"""
-        pt_list = points_in_circle_np(radius, self.loc.y, self.loc.x)
-        height, width = len(maze.matrix), len(maze.matrix[1])
-        return_map = np.zeros(shape=(height, width))
-        for i in pt_list:
-            if i.x >= 0 and i.x < width and i.y >= 0 and i.y < height:
-                return_map[i.y][i.x] = maze.matrix[i.y][i.x]
+        """Generate the map of the box.
+
+        Only the part of the maze around the points that are shown is kept,
+        with a margin of one empty cell so the walls at its edge look the
+        same as in the whole maze, and drawn where it is in the maze.
+        """
+        points = circle_points(radius, self.loc.y, self.loc.x)
+        height, width = maze.matrix.shape
+        columns, rows = points[:, 0], points[:, 1]
+        inside = (columns < width) & (rows < height)
+        columns, rows = columns[inside], rows[inside]
+        if rows.size:
+            top, left = max(rows.min() - 1, 0), max(columns.min() - 1, 0)
+            bottom, right = min(rows.max() + 2, height), min(columns.max() + 2, width)
+        else:
+            top, left, bottom, right = 0, 0, 1, 1
+        return_map = np.zeros(shape=(bottom - top, right - left), dtype=np.uint8)
+        return_map[rows - top, columns - left] = maze.matrix[rows, columns]
+
         self.maze = copy(maze)
         self.maze.matrix = return_map
-        cells = copy(self.maze.cells)
-        for i in range(len(cells) // 2):
-            if not (pt_list - Vec(cells[i].x, cells[i].y)).any():
-                del cells[i]
-        self.maze.cells = cells
-        new_maze = str(self.maze).split("\n")
-        new_maze_shape = Vec(len(new_maze[0]), len(new_maze))
-        self.maze.set_top_left_corner(new_maze_shape)
-        new_line = term.move_left(new_maze_shape.x) + term.move_down(1)
-        new_maze = new_line.join(new_maze)  # type: ignore
-        new_maze = new_maze.replace(" ", term.move_right(1))  # type: ignore
-
-        self.maze.map = term.move_xy(*self.maze.top_left_corner) + new_maze  # type: ignore
-        logging.debug(str(self.maze))
+        self.maze.top_left_corner = maze.mat2screen((top, left))
+        self.maze.map = self.maze.erase_map = None
+        share_maps(self.maze)
         return None
 
-    def generate_image(self) -> None:
-        """Generate image for the box"""
-        image = term.move_xy(*self.maze.mat2screen(self.loc) - (1, 1))
+    def generate_image(self, maze: Maze = None) -> None:
+        """Generate image for the box, at its location in maze or else in its own maze"""
+        image = term.move_xy(*(maze or self.maze).mat2screen(self.loc) - (1, 1))
         image += image + "┌" + " " * (self.shape.x - 2) + "┐"
         image += term.move_down(self.shape.y - 1)  # type: ignore
         image += term.move_left(self.shape.x)  # type: ignore
@@ -1,23 +1,25 @@
 from __future__ import annotations
 
 import time
-from copy import copy
 from typing import TYPE_CHECKING, Dict
 
 if TYPE_CHECKING:
     from maze_gitb.core.maze import Maze
 
-from blessed import Terminal
 from blessed.keyboard import Keystroke
 
 from maze_gitb.core.render import Render
+from maze_gitb.core.session import Monostate, SessionLocal
 from maze_gitb.core.sound import (
     play_echo, play_enter_box_sound, play_hit_wall_sound
 )
+from maze_gitb.core.terminal import (
+    current_terminal, cursor_moves, get_terminal
+)
 from maze_gitb.utils import Vec  # type: ignore
 
-term = Terminal()
-render = Render()
+term = get_terminal()
+render: Render = SessionLocal(Render)  # type: ignore
 
 
 class Cursor:
@@ -39,42 +41,45 @@ class Cursor:
         bg_col: str = "white",
     ) -> None:
 
+        # where the cursor was drawn, and where the last move started
         self.prev_coords = coords
+        self.moved_from = coords
         self.coords = coords
         self.fill = fill
         self.scene_render = render
         self.speed = speed
         self.direction = Vec(1, 0)
-        self.term = term
+        self.term = current_terminal()
+        self.moves = cursor_moves()
         self.col = col
         self.bg_col = bg_col
+        # size of the area the cursor moves in, the terminal if None
+        self.area: Vec = None
 
     def move(self, move: str) -> None:
-        """Move the cursor to a new position based on direction and speed."""
+        """Move the cursor to a new position based on direction and speed, moves before it is drawn add up."""
         self.direction = self.directions[move]
-        self.coords.x = min(
-            max(self.prev_coords.x + self.direction.x * self.speed.x, 0),
-            self.term.width - 2,
-        )
-        self.coords.y = min(
-            max(self.prev_coords.y + self.direction.y * self.speed.y, 0),
-            self.term.height - 2,
+        width, height = self.area or (self.term.width, self.term.height)
+        self.moved_from = self.coords
+        self.coords = Vec(
+            min(max(self.coords.x + self.direction.x * self.speed.x, 0), width - 2),
+            min(max(self.coords.y + self.direction.y * self.speed.y, 0), height - 2),
         )
         self.clear()
 
     def stop(self) -> None:
         """Stop current move and go back"""
-        self.coords = copy(self.prev_coords)
+        self.coords = self.moved_from
 
     def clear(self) -> None:
         """Clears the rendered cursor"""
-        frame = f"{self.term.move_xy(*self.prev_coords)}" + " " * len(self.fill)
+        frame = self.moves.move_xy(*self.prev_coords) + " " * len(self.fill)
         render(frame, bg_col=self.bg_col)
 
     def render(self) -> None:
         """Renders the cursor"""
-        self.prev_coords = copy(self.coords)
-        frame = self.term.move_xy(*self.coords) + self.fill
+        self.prev_coords = self.coords
+        frame = self.moves.move_xy(*self.coords) + self.fill
         render(frame, col=self.col, bg_col=self.bg_col)
 
 
@@ -89,7 +94,8 @@ class Score:
     def update(
         self, player_inside_box: bool = False, collision_count: int = None
     ) -> None:
-        """Update score based on collision count and whether player is inside box"""
+        """Update score based on collision count and whether player is inside box, drawing a new value"""
+        shown = int(self.value)
         if collision_count:
             self.value -= collision_count * 2
         else:
@@ -98,23 +104,22 @@ class Score:
                 self.value -= self.penalty / 2
             else:
                 self.value -= self.penalty
-        self.render()
+        # most ticks take off less than a point
+        if int(self.value) != shown:
+            self.render()
 
     def render(self) -> None:
         """Render score"""
         txt = f"Persistence: {str(int(self.value)).zfill(3)}"
         txt = term.home + term.move_x(term.width - 18) + txt
-        render(txt, col="black")
+        render(txt, col="black", hud=True)
 
 
-class Player:
-    """Player class, controls player movement and scores"""
-
-    __monostate = None
+class Player(Monostate):
+    """Player class, controls player movement and scores, one per session"""
 
     def __init__(self, location: Vec = Vec(1, 1)):
-        if not Player.__monostate:
-            Player.__monostate = self.__dict__
+        if self.first_in_session():
             self.start_loc = location
             self.avi = Cursor(
                 location, fill="█", speed=Vec(1, 1), bg_col="lightskyblue1"
@@ -124,14 +129,13 @@ class Player:
             self.collision_count = 0
             self.prev_colsn_time = time.time()
             self.inside_box: Dict[str, bool] = {}
-        else:
-            self.__dict__ = Player.__monostate
 
     def start(self) -> None:
         """Called when the game is started"""
         self.avi.coords = self.start_loc
         self.avi.render()
         self.score.update()
+        self.score.render()
 
     def update(self, val: Keystroke, maze: Maze) -> None:
         """Handle player movement"""
@@ -145,48 +149,21 @@ class Player:
                 self.score.update(collision_count=self.collision_count)
                 self.prev_colsn_time = collision_time
                 txt = term.home + f"Collisions: {self.collision_count}"
-                render(txt, col="black")
+                render(txt, col="black", hud=True)
 
                 # play sound
-                play_hit_wall_sound(self.avi.coords - self.avi.prev_coords)
+                play_hit_wall_sound(self.avi.coords - self.avi.moved_from)
             self.avi.stop()
 
     def wall_at(self, screen: Vec, maze: Maze, direction: str) -> bool:
         """Return True if there is a wall at (x, y). Values outside the valid range always return False."""
         screen = screen - maze.top_left_corner
-        return maze.char_matrix[screen.y][screen.x].char != " "
+        return bool(maze.char_matrix.walls[screen.y, screen.x])
 
     def player_movement_sound(self, maze: Maze) -> None:
         """Make player sound on move"""
-        y, x = maze.screen2mat(self.avi.coords)
-        screen = self.avi.coords - maze.top_left_corner
-        nearest_wall = Vec(x, y)
-        direction = copy(self.avi.direction)
-        wall_found = False
-
-        while not wall_found:
-            if (
-                nearest_wall.x >= len(maze.matrix[0]) - 1
-                or nearest_wall.y >= len(maze.matrix) - 1
-            ):
-                break
-            nearest_wall += direction
-            wall_found = maze.matrix[nearest_wall.y][nearest_wall.x] == 1
-
-        if all(direction == (1, 0)):  # right
-            if screen.x == 2 * x:
-                self._play_echo(direction, 2 * (nearest_wall.x - x))
-            else:
-                self._play_echo(direction, 2 * (nearest_wall.x - x) - 1)
-        elif all(direction == (-1, 0)):  # left
-            if maze.matrix[y][x] == 1:
-                play_echo(direction, -1)
-            elif screen.x == 2 * x:
-                play_echo(direction, 2 * (nearest_wall.x - x) - 1)
-            else:
-                self._play_echo(direction, 2 * (nearest_wall.x - x))
-        else:
-            self._play_echo(direction, nearest_wall.y - y)
+        direction = self.avi.direction
+        self._play_echo(direction, maze.wall_distance(self.avi.coords, direction))
 
     def _play_echo(self, direction: Vec, distance: float) -> None:
         play_echo(direction, distance)
@@ -216,7 +193,7 @@ class MenuCursor(Cursor):
         bg_col: str = "peachpuff2",
     ) -> None:
         super().__init__(coords, fill=fill, col=col, bg_col=bg_col)
-        self.l_bounds = copy(coords)
+        self.l_bounds = coords
         self.u_bounds = coords + bounds
         self.bounds = bounds
         self.options = options
@@ -226,7 +203,10 @@ class MenuCursor(Cursor):
         """A bounded move method"""
         super(MenuCursor, self).move(direction)
         new_loc = self.coords
-        if any(self.l_bounds > new_loc) or any(new_loc > self.u_bounds):
+        if not (
+            self.l_bounds.x <= new_loc.x <= self.u_bounds.x
+            and self.l_bounds.y <= new_loc.y <= self.u_bounds.y
+        ):
             self.stop()
         else:
             self.selected += self.directions[direction].y
@@ -1,12 +1,26 @@
-from typing import Callable, List
+import logging
+import os
+import re
+import select
+import time
+from typing import Callable, Dict, List, Tuple
 
-from blessed import Terminal
+from blessed.formatters import CGA_COLORS, X11_COLORNAMES_TO_RGB
 
+from maze_gitb.core.screen import Screen, diff
+from maze_gitb.core.session import Monostate
+from maze_gitb.core.terminal import current_terminal
 
-class Render(object):
+# frames that start by moving the cursor don't need to go home first
+ADDRESSED = re.compile(r"\x1b\[[0-9;]*[Hf]")
+SGR = re.compile(r"\x1b\[[0-9;]*m")
+
+
+class Render(Monostate):
     """Render class to put things on the screen
 
-    This class can be instantiated anywhere.
+    This class can be instantiated anywhere, the instances of a session
+    draw on its terminal.
     Example:
         ```
         from maze_gitb.core.render import Render
@@ -14,35 +28,157 @@ class Render(object):
         render = Render()
         render("this text", col="black", bg_col="lightskyblue1")
         ```
-    """
 
-    __monostate = None
+    Colours are resolved once per (col, bg_col) and only sent when they
+    differ from the colours the terminal is already using.
+
+    With `use_back_buffer()` draw calls go into a model of the screen
+    instead, and `screen()` returns only the cells that changed. The model
+    can then be moved over a world bigger than the terminal with
+    `set_camera`, frames drawn with `hud=True` stay put on the terminal.
+    """
 
     def __init__(self, col: str = "black", bg_col: str = "lightskyblue1"):
-        if not Render.__monostate:
-            Render.__monostate = self.__dict__
+        if self.first_in_session():
             self.frames: List[str] = [""]
-            self.term = Terminal()
+            # number of draw calls so far
+            self.draws = 0
+            self.term = current_terminal()
             self.col = col
             self.bg_col = bg_col
+            # (col, bg_col, number of colours) -> escape sequence
+            self.palette: Dict[Tuple[str, str, int], str] = {}
+            # colours the terminal is using, None when a frame changed them on its own
+            self.sgr: str = None
+            # what the next frame should show and what the terminal shows now
+            self.back: Screen = None
+            self.front: Screen = None
 
-        else:
-            self.__dict__ = Render.__monostate
-
-    def __call__(self, frame: str, col: str = None, bg_col: str = None) -> None:
+    def __call__(self, frame: str, col: str = None, bg_col: str = None, hud: bool = False) -> None:
         """Adds font color and background color on text"""
+        self.draws += 1
         if col is None:
             col = self.col
         if bg_col is None:
             bg_col = self.bg_col
 
-        paint: Callable[[str], str] = getattr(self.term, f"{col}_on_{bg_col}")
-        bg = getattr(self.term, f"on_{self.bg_col}")
-        frame = self.term.home + paint(frame) + bg
-        self.frames.append(frame)
+        style = self.palette.get((col, bg_col, self.term.number_of_colors))
+        if style is None:
+            style = self.colours(col, bg_col)
+        # a frame with its own colours leaves the terminal in a state we don't track
+        sgr = None if "m" in frame and SGR.search(frame) else style
+        if not ADDRESSED.match(frame):
+            frame = self.term.home + frame
+        if style != self.sgr:
+            frame = style + frame
+        self.sgr = sgr
+        if self.back is not None and hud:
+            origin = self.back.origin
+            self.back.set_origin((0, 0))
+            self.back.feed(frame)
+            self.back.set_origin(origin)
+        elif self.back is not None:
+            self.back.feed(frame)
+        else:
+            self.frames.append(frame)
+
+    def colours(self, col: str, bg_col: str) -> str:
+        """Return the escape sequence for named colours, downsampled to the terminal's number of colours"""
+        key = (col, bg_col, self.term.number_of_colors)
+        style = self.palette.get(key)
+        if style is None:
+            if not self.term.number_of_colors:
+                style = ""
+            else:
+                style = self._colour(col, self.term.color_rgb) + self._colour(f"on_{bg_col}", self.term.on_color_rgb)
+            self.palette[key] = style
+        return style
+
+    def _colour(self, name: str, rgb: Callable[[int, int, int], str]) -> str:
+        """Return the escape sequence of one colour name, like black or on_peachpuff2"""
+        colour = name[3:] if name.startswith("on_") else name
+        if colour in X11_COLORNAMES_TO_RGB and colour not in CGA_COLORS:
+            return str(rgb(*X11_COLORNAMES_TO_RGB[colour]))
+        # the basic colours are the terminal's own palette
+        return str(getattr(self.term, name))
+
+    def use_back_buffer(self, enabled: bool = True) -> None:
+        """Turn damage tracking on or off, the next frame is sent in full"""
+        if enabled:
+            self.back = Screen(self.term.width, self.term.height, blank=" ")
+            self.front = Screen(self.term.width, self.term.height)
+        else:
+            self.back = self.front = None
+        self.sgr = None
+
+    def resize(self) -> None:
+        """Make the back buffer the size of the terminal, keeping the camera, the next frame is sent in full"""
+        if self.back is None:
+            return
+        origin = self.back.origin
+        self.use_back_buffer()
+        self.back.set_origin(origin)
+
+    def set_camera(self, offset: Tuple[int, int]) -> None:
+        """Draw the world location offset at the top left of the terminal from now on"""
+        if self.back is None:
+            if tuple(offset) != (0, 0):
+                logging.error(RuntimeError("Moving the camera needs the back buffer"))
+            return
+        self.back.set_origin(tuple(offset))
 
     def screen(self) -> str:
-        """Get all the frames."""
-        frame = "".join(self.frames) + self.term.home
-        self.frames = [""]
-        return frame
+        """Get all the frames, an empty string if nothing was drawn."""
+        if self.back is not None:
+            frame = diff(self.front, self.back)
+        else:
+            frame = "".join(self.frames)
+            self.frames = [""]
+        return frame + self.term.home if frame else ""
+
+
+class FrameWriter:
+    """Writes each frame to a file descriptor with as few system calls as it can.
+
+    The frame is encoded once and written with `os.write`, which is retried
+    with the rest of it, through a memoryview so it isn't copied, until the
+    terminal took all of it.
+    """
+
+    def __init__(self, fd: int, encoding: str = "utf-8") -> None:
+        self.fd = fd
+        self.encoding = encoding
+        self.frames = 0
+        self.bytes = 0
+        self.syscalls = 0
+        # times the terminal was full and the write waited for it
+        self.waits = 0
+        self.seconds = 0.0
+
+    def write(self, frame: str) -> int:
+        """Write frame and return the number of bytes written, empty frames are skipped"""
+        if not frame:
+            return 0
+        start = time.perf_counter()
+        written = 0
+        with memoryview(frame.encode(self.encoding)) as data:
+            while written < len(data):
+                try:
+                    written += os.write(self.fd, data[written:])
+                except BlockingIOError:
+                    # non blocking terminal with a full buffer, wait until it drains
+                    select.select([], [self.fd], [])
+                    self.waits += 1
+                else:
+                    self.syscalls += 1
+        self.frames += 1
+        self.bytes += written
+        self.seconds += time.perf_counter() - start
+        return written
+
+    def report(self) -> str:
+        """Return write statistics"""
+        return (
+            f"wrote {self.frames} frames, {self.bytes} bytes in {self.syscalls} writes "
+            f"with {self.waits} waits for the terminal, taking {self.seconds * 1e3:.1f} ms"
+        )
@@ -0,0 +1,152 @@
+import heapq
+import itertools
+import time
+from typing import Callable, List, Optional
+
+from maze_gitb.core.session import SessionLocal
+
+
+class Scheduler:
+    """Fixed time step clock for the game loop.
+
+    Scenes advance in ticks of `period` seconds however fast keys arrive.
+    Ticks that fall behind are caught up, unless the loop is more than
+    `max_catch_up` ticks late, then the backlog is dropped.
+
+    Example:
+        ```
+        scheduler = Scheduler(0.05)
+        while True:
+            if scheduler.due():
+                scene.tick()
+            else:
+                key = term.inkey(timeout=scheduler.timeout())
+        ```
+    """
+
+    def __init__(self, period: float = 0.05, max_catch_up: int = 5, clock: Callable[[], float] = time.monotonic):
+        self.period = period
+        self.max_catch_up = max_catch_up
+        self.clock = clock
+        self.deadline: float = None
+
+        self.ticks = 0
+        # ticks that started more than a whole period late
+        self.overruns = 0
+        self.dropped = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+
+    def stop(self) -> None:
+        """Stop ticking, the next `due` starts a new clock"""
+        self.deadline = None
+
+    def due(self) -> bool:
+        """Return True if a tick is due now, and count it"""
+        now = self.clock()
+        if self.deadline is None:
+            self.deadline = now + self.period
+            return False
+        if now < self.deadline:
+            return False
+
+        lag = now - self.deadline
+        self.ticks += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        if lag > self.period:
+            self.overruns += 1
+        if lag > self.period * self.max_catch_up:
+            # too far behind, catching up would only make the game jump ahead
+            self.dropped += int(lag / self.period)
+            self.deadline = now + self.period
+        else:
+            self.deadline += self.period
+        return True
+
+    def timeout(self) -> float:
+        """Return the seconds until the next tick is due"""
+        if self.deadline is None:
+            return self.period
+        return max(self.deadline - self.clock(), 0.0)
+
+    def report(self) -> str:
+        """Return tick statistics"""
+        mean_lag = self.total_lag / self.ticks if self.ticks else 0.0
+        return (
+            f"{self.ticks} ticks of {self.period * 1e3:.0f} ms, {self.overruns} overran, {self.dropped} dropped, "
+            f"lag mean {mean_lag * 1e3:.2f} ms max {self.max_lag * 1e3:.2f} ms"
+        )
+
+
+class ManualClock:
+    """Clock that only moves when told to, so timing can be checked without waiting.
+
+    Example:
+        ```
+        clock = ManualClock()
+        timers = Timers(clock=clock)
+        timers.after(0.3, echo)
+        clock.advance(0.3)
+        assert timers.fire() == 1
+        ```
+    """
+
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        """Return the time now"""
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        """Move the clock forward"""
+        self.now += seconds
+
+
+class Timers:
+    """Actions that run once after a delay, like the second sound of an echo.
+
+    The actions are kept in a heap by when they are due. Nothing here
+    sleeps: the game loop waits for keys at most `timeout` seconds and then
+    calls `fire`, so actions run on time to within a few milliseconds
+    whatever the tick period. Actions due at the same time run in the
+    order they were added. What they draw is shown with the next frame.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        # (due, order added, action, arguments)
+        self.heap: List[tuple] = []
+        self.order = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def after(self, delay: float, action: Callable[..., None], *args: object) -> None:
+        """Run action with args delay seconds from now"""
+        heapq.heappush(self.heap, (self.clock() + delay, next(self.order), action, args))
+
+    def timeout(self) -> Optional[float]:
+        """Return the seconds until the next action is due, None if there is none"""
+        if not self.heap:
+            return None
+        return max(self.heap[0][0] - self.clock(), 0.0)
+
+    def fire(self) -> int:
+        """Run the actions that are due and return how many ran"""
+        now = self.clock()
+        fired = 0
+        while self.heap and self.heap[0][0] <= now:
+            _, _, action, args = heapq.heappop(self.heap)
+            action(*args)
+            fired += 1
+        return fired
+
+    def clear(self) -> None:
+        """Forget the actions that didn't run yet"""
+        self.heap = []
+
+
+# the timers of the game, sounds and scenes add to them and the game loop fires them, one per session
+timers: Timers = SessionLocal(Timers)  # type: ignore
@@ -0,0 +1,242 @@
+"""In-memory model of the terminal screen.
+
+`Screen` interprets the escape sequences the game emits (cursor moves, text,
+colours and clears) into a grid of cells. `Render` keeps a back buffer of what
+the next frame should look like and a front buffer of what the terminal shows,
+and `diff` turns the difference into the shortest frame it can.
+"""
+import re
+from typing import Dict, List, Tuple
+
+# control sequences, character set selections, other escapes and the C0 controls we follow
+TOKEN = re.compile(r"\x1b\[([0-?]*)[ -/]*([@-~])|\x1b[()*+].|\x1b.|[\n\r\b]")
+# a style is the SGR sequence that recreates it, so one string compare tells two cells apart
+DEFAULT_STYLE = "\x1b[m"
+
+_styles: Dict[Tuple[Tuple[str, ...], str, str], str] = {}
+
+
+def _style(attrs: Tuple[str, ...], fg: str, bg: str) -> str:
+    """Return the interned SGR sequence for a set of attributes and colours"""
+    key = (attrs, fg, bg)
+    style = _styles.get(key)
+    if style is None:
+        params = ";".join(("0",) + attrs + tuple(p for p in (fg, bg) if p))
+        style = _styles[key] = f"\x1b[{params}m" if params != "0" else DEFAULT_STYLE
+    return style
+
+
+class Screen:
+    """Grid of (glyph, style) cells, updated by feeding it terminal output.
+
+    The grid is a window onto a larger canvas whose top left corner is at
+    `origin`, cursor addresses are canvas locations. Unlike a terminal the
+    cursor may leave the window, and text outside it is dropped rather than
+    wrapped.
+    """
+
+    def __init__(self, width: int, height: int, blank: str = "") -> None:
+        self.width = width
+        self.height = height
+        self.origin = (0, 0)
+        self.glyphs: List[List[str]] = [[blank] * width for _ in range(height)]
+        self.styles: List[List[str]] = [[DEFAULT_STYLE] * width for _ in range(height)]
+        self.x = 0
+        self.y = 0
+        self.fg = ""
+        self.bg = ""
+        self.attrs: Tuple[str, ...] = ()
+        self.style = DEFAULT_STYLE
+        # style of the last full clear since the previous diff, None if there was none
+        self.cleared: str = None
+        # sequences the model does not follow, e.g. cursor visibility, sent as they are
+        self.passthrough: List[str] = []
+        # False while nothing was drawn since the last diff
+        self.changed = True
+
+    def fill(self, style: str) -> None:
+        """Blank every cell with the given style"""
+        self.changed = True
+        for row, styles in zip(self.glyphs, self.styles):
+            row[:] = [" "] * self.width
+            styles[:] = [style] * self.width
+
+    def feed(self, data: str) -> None:
+        """Apply terminal output to the grid"""
+        self.changed = True
+        pos = 0
+        for match in TOKEN.finditer(data):
+            start = match.start()
+            if start > pos:
+                self._write(data[pos:start])
+            pos = match.end()
+            final = match.group(2)
+            if final is not None:
+                self._control(match.group(1), final, match.group(0))
+            elif match.group(0) == "\n":
+                self.x, self.y = -self.origin[0], self.y + 1
+            elif match.group(0) == "\r":
+                self.x = -self.origin[0]
+            elif match.group(0) == "\b":
+                self.x -= 1
+            elif match.group(0)[1] not in "()*+":
+                self.passthrough.append(match.group(0))
+        if pos < len(data):
+            self._write(data[pos:])
+
+    def _write(self, text: str) -> None:
+        """Put text at the cursor, keeping only the part inside the window"""
+        x, y = self.x, self.y
+        self.x += len(text)
+        if 0 <= y < self.height:
+            start, stop = max(x, 0), min(self.x, self.width)
+            if start < stop:
+                self.glyphs[y][start:stop] = text[start - x:stop - x]
+                self.styles[y][start:stop] = [self.style] * (stop - start)
+
+    def _control(self, params: str, final: str, sequence: str) -> None:
+        """Apply one control sequence"""
+        if params and not params.replace(";", "").isdigit():
+            # private modes like "?25l" and sub-parameters we don't model
+            self.passthrough.append(sequence)
+            return
+        if final == "m":
+            self._sgr(params)
+            return
+        args = [int(p) if p else 0 for p in params.split(";")] if params else []
+        n = max(args[0], 1) if args else 1
+        if final in "Hf":
+            row = args[0] if args else 1
+            col = args[1] if len(args) > 1 else 1
+            self.y = max(row, 1) - 1 - self.origin[1]
+            self.x = max(col, 1) - 1 - self.origin[0]
+        elif final == "A":
+            self.y -= n
+        elif final == "B":
+            self.y += n
+        elif final == "C":
+            self.x += n
+        elif final == "D":
+            self.x -= n
+        elif final == "G":
+            self.x = n - 1 - self.origin[0]
+        elif final == "d":
+            self.y = n - 1 - self.origin[1]
+        elif final == "J":
+            mode = args[0] if args else 0
+            if mode == 2:
+                self.fill(self.style)
+                self.cleared = self.style
+            elif mode == 0:
+                self._erase(self.y, self.x, self.width)
+                for y in range(max(self.y + 1, 0), self.height):
+                    self._erase(y, 0, self.width)
+            else:
+                self.passthrough.append(sequence)
+        elif final == "K":
+            mode = args[0] if args else 0
+            if mode == 0:
+                self._erase(self.y, self.x, self.width)
+            else:
+                self.passthrough.append(sequence)
+        else:
+            self.passthrough.append(sequence)
+
+    def set_origin(self, origin: Tuple[int, int]) -> None:
+        """Move the window over the canvas, the cells keep what they show until drawn over"""
+        self.x += self.origin[0] - origin[0]
+        self.y += self.origin[1] - origin[1]
+        self.origin = origin
+
+    def _erase(self, y: int, start: int, stop: int) -> None:
+        """Blank part of a row with the current style"""
+        if not 0 <= y < self.height:
+            return
+        start = max(start, 0)
+        if start < stop:
+            self.glyphs[y][start:stop] = [" "] * (stop - start)
+            self.styles[y][start:stop] = [self.style] * (stop - start)
+
+    def _sgr(self, params: str) -> None:
+        """Follow a select graphic rendition sequence"""
+        codes = params.split(";") if params else ["0"]
+        attrs = list(self.attrs)
+        i = 0
+        while i < len(codes):
+            code = int(codes[i] or 0)
+            if code in (38, 48):
+                size = 3 if i + 1 < len(codes) and codes[i + 1] == "5" else 5
+                colour = ";".join(codes[i:i + size])
+                if code == 38:
+                    self.fg = colour
+                else:
+                    self.bg = colour
+                i += size
+                continue
+            if code == 0:
+                attrs, self.fg, self.bg = [], "", ""
+            elif 30 <= code <= 37 or 90 <= code <= 97:
+                self.fg = str(code)
+            elif code == 39:
+                self.fg = ""
+            elif 40 <= code <= 47 or 100 <= code <= 107:
+                self.bg = str(code)
+            elif code == 49:
+                self.bg = ""
+            elif 1 <= code <= 9 and str(code) not in attrs:
+                attrs.append(str(code))
+            elif 21 <= code <= 29:
+                # 22 turns off both bold and faint
+                off = {"1", "2"} if code == 22 else {str(code - 20)}
+                attrs = [a for a in attrs if a not in off]
+            i += 1
+        self.attrs = tuple(attrs)
+        self.style = _style(self.attrs, self.fg, self.bg)
+
+
+def diff(front: Screen, back: Screen) -> str:
+    """Return the output that turns front into back, and update front to match.
+
+    Nothing is compared if nothing was drawn since the last diff, which is
+    most ticks. Unchanged rows are skipped with a single list compare.
+    Within a row the cursor moves right over short runs by rewriting them,
+    and jumps otherwise.
+    """
+    if not back.changed:
+        return ""
+    back.changed = False
+    out: List[str] = back.passthrough
+    back.passthrough = []
+    style = None
+    if back.cleared is not None:
+        out.append(back.cleared + "\x1b[2J")
+        front.fill(back.cleared)
+        style = back.cleared
+        back.cleared = None
+
+    cursor = None
+    for y, (glyphs, styles, old_glyphs, old_styles) in enumerate(
+        zip(back.glyphs, back.styles, front.glyphs, front.styles)
+    ):
+        if glyphs == old_glyphs and styles == old_styles:
+            continue
+        for x in range(back.width):
+            glyph, cell_style = glyphs[x], styles[x]
+            if glyph == old_glyphs[x] and cell_style == old_styles[x]:
+                continue
+            if cursor is None or cursor[1] != y or cursor[0] > x:
+                out.append(f"\x1b[{y + 1};{x + 1}H")
+            elif cursor[0] < x:
+                gap = x - cursor[0]
+                if gap <= 3 and all(s == style for s in styles[cursor[0]:x]):
+                    out.append("".join(glyphs[cursor[0]:x]))
+                else:
+                    out.append(f"\x1b[{gap}C")
+            if cell_style != style:
+                out.append(cell_style)
+                style = cell_style
+            out.append(glyph)
+            cursor = (x + 1, y)
+        old_glyphs[:] = glyphs
+        old_styles[:] = styles
+    return "".join(out)
@@ -0,0 +1,125 @@
+"""What each game played by the process has to itself.
+
+The process plays one game, or with `maze_gitb.server` many games at once
+in one event loop, each in a session of its own. A session is a
+`contextvars.Context`, and the modules keep what belongs to one game in
+objects that look it up in the session of the code using them:
+
+- `Monostate` is the base of classes whose instances share their
+  attributes, like `Render` and `Player`. They share them with the
+  instances made in the same session only.
+- `SessionLocal` stands for one object per session, like the terminal and
+  the timers, or the `Render` of a module.
+
+Without a server the whole process is one session. `new_session` makes
+another one, tasks started in it belong to it. `build_in_thread` runs
+what takes the event loop too long, like making the scenes of a session,
+on a thread of its own in the session that asked.
+
+Example:
+    ```
+    session = new_session()
+    session.run(use_terminal, HeadlessTerminal(80, 24))
+    task = session.run(asyncio.ensure_future, play())
+    ```
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import Context, ContextVar, copy_context
+from typing import Callable, Dict, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+# everything the session has to itself, by the object it belongs to
+_state: ContextVar[Dict[object, object]] = ContextVar("session", default={})
+
+
+def new_session() -> Context:
+    """Return a context to run a new session in, which shares nothing with the others"""
+    session = Context()
+    session.run(_state.set, {})
+    return session
+
+
+# builds for every session, one at a time, so the event loop waits at most
+# a switch interval of the GIL while it runs
+_builder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="build")
+
+
+def build_in_thread(fn: Callable[..., T], *args: object) -> "asyncio.Future[T]":
+    """Return a future of fn(*args) called on the thread that builds for every session, in this session.
+
+    What fn sets on `Monostate` and `SessionLocal` objects the session sees,
+    context variables it sets it doesn't. fn shouldn't touch what the tasks
+    of the session are using. Raises RuntimeError without a running event loop.
+    """
+    return asyncio.get_running_loop().run_in_executor(_builder, copy_context().run, fn, *args)
+
+
+class Monostate:
+    """Base of classes whose instances share their attributes within a session.
+
+    An instance gets the `__dict__` of the session it is made in, so its
+    attributes are looked up like any others. An instance made when a
+    module is imported belongs to the session of the import, modules keep
+    a `SessionLocal` of the class instead. `__init__` of a subclass should
+    only set the attributes when `first_in_session` says so.
+    """
+
+    def __new__(cls, *args: object, **kwargs: object) -> "Monostate":
+        """Return an instance with the attributes of this session"""
+        self = super().__new__(cls)
+        self.__dict__ = _state.get().setdefault(cls, {})
+        return self
+
+    def first_in_session(self) -> bool:
+        """Return True if no instance set attributes in this session yet"""
+        return not self.__dict__
+
+
+class SessionLocal(Generic[T]):
+    """Stands for one object per session, made by factory the first time the session uses it.
+
+    Attributes are those of the object of the session using it. Without a
+    factory the object has to be `set` first.
+    """
+
+    __slots__ = ("_factory",)
+
+    def __init__(self, factory: Callable[[], T] = None) -> None:
+        object.__setattr__(self, "_factory", factory)
+
+    def get(self) -> T:
+        """Return the object of this session"""
+        state = _state.get()
+        try:
+            return state[self]  # type: ignore
+        except KeyError:
+            if self._factory is None:
+                raise LookupError("Nothing was set for this session") from None
+            value = state[self] = self._factory()
+            return value
+
+    def find(self) -> Optional[T]:
+        """Return the object of this session, None if there is none yet"""
+        return _state.get().get(self)  # type: ignore
+
+    def set(self, value: T) -> None:
+        """Make value the object of this session"""
+        _state.get()[self] = value
+
+    def __getattr__(self, name: str) -> object:
+        return getattr(self.get(), name)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        setattr(self.get(), name, value)
+
+    def __call__(self, *args: object, **kwargs: object) -> object:
+        """Call the object of this session"""
+        return self.get()(*args, **kwargs)  # type: ignore
+
+    def __len__(self) -> int:
+        return len(self.get())  # type: ignore
+
+    def __bool__(self) -> bool:
+        return bool(self.get())
@@ -0,0 +1,115 @@
+"""Path finding on maze grids."""
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Tuple
+
+import numpy as np
+
+from maze_gitb.core.terminal import cursor_moves
+from maze_gitb.utils import Vec, bfs_distances  # type: ignore
+
+if TYPE_CHECKING:
+    from maze_gitb.core.maze import Maze
+
+# (row, column) steps, indexed by the codes stored in `DistanceField.toward`
+STEPS = (Vec(-1, 0), Vec(1, 0), Vec(0, -1), Vec(0, 1))
+CACHE_SIZE = 16
+
+
+class DistanceField:
+    """Walking distance from every cell of a grid to a goal, and the way to walk there.
+
+    Everything is computed once, every query afterwards is O(1) per step.
+    Positions are (row, column) of `passable`, a bool array that is True
+    where one can walk, e.g. `maze.matrix == AIR` or `~maze.char_matrix.walls`.
+    """
+
+    def __init__(self, passable: np.ndarray, goal: Tuple[int, int]):
+        self.goal = Vec(*goal)
+        self.distances = bfs_distances(passable, self.goal)
+
+        # index into STEPS of a neighbour that is one step closer, -1 if there is none
+        self.toward = np.full(passable.shape, -1, dtype=np.int8)
+        height, width = passable.shape
+        closer = self.distances - 1
+        padded = np.pad(self.distances, 1, constant_values=-2)
+        for code, (dy, dx) in enumerate(STEPS):
+            neighbour = padded[1 + dy:1 + dy + height, 1 + dx:1 + dx + width]
+            self.toward[(neighbour == closer) & (closer >= 0) & (self.toward < 0)] = code
+
+    def reachable(self, pos: Tuple[int, int]) -> bool:
+        """Return True if the goal can be reached from pos"""
+        return bool(self.distances[pos] >= 0)
+
+    def distance(self, pos: Tuple[int, int]) -> int:
+        """Return number of steps from pos to the goal, -1 if it can't be reached"""
+        return int(self.distances[pos])
+
+    def next_step(self, pos: Tuple[int, int]) -> Vec:
+        """Return the position one step closer to the goal, None at the goal or if it can't be reached"""
+        code = self.toward[pos]
+        if code < 0:
+            return None
+        return STEPS[code] + pos
+
+    def path(self, pos: Tuple[int, int], limit: int = None) -> List[Vec]:
+        """Return up to `limit` positions of the shortest path from pos, not including pos"""
+        path = []
+        pos = self.next_step(pos)
+        while pos is not None and (limit is None or len(path) < limit):
+            path.append(pos)
+            pos = self.next_step(pos)
+        return path
+
+
+_fields: "OrderedDict[tuple, DistanceField]" = OrderedDict()
+
+
+def distance_field(passable: np.ndarray, goal: Tuple[int, int]) -> DistanceField:
+    """Return the distance field of goal, grids with the same layout share it"""
+    key = (passable.shape, hashlib.blake2b(passable.tobytes(), digest_size=16).digest(), tuple(goal))
+    if key in _fields:
+        _fields.move_to_end(key)
+    else:
+        _fields[key] = DistanceField(passable, goal)
+        if len(_fields) > CACHE_SIZE:
+            _fields.popitem(last=False)
+    return _fields[key]
+
+
+class Hint:
+    """Trail of the next few steps from the player toward the goal, drawn on top of the maze.
+
+    The player walks the screen characters of the maze, so the path is found
+    on `maze.char_matrix` rather than on the coarser `maze.matrix`.
+    """
+
+    def __init__(self, maze: Maze, goal: Vec, steps: int = 6, char: str = "·"):
+        self.maze = maze
+        self.goal = goal
+        self.steps = steps
+        self.char = char
+        self.field: DistanceField = None
+        self.shown: List[Vec] = []
+        self.moves = cursor_moves()
+
+    def show(self, player: Vec) -> str:
+        """Return frame moving the trail to start from the player's screen location"""
+        origin = self.maze.char_matrix.origin
+        if self.field is None:
+            self.field = distance_field(~self.maze.char_matrix.walls, tuple(reversed(self.goal - origin)))
+        frame = self.hide()
+        path = self.field.path(tuple(reversed(player - origin)), self.steps)
+        self.shown = [origin + (x, y) for y, x in path]
+        for loc in self.shown:
+            if loc != self.goal:
+                frame += self.moves.move_xy(*loc) + self.char
+        return frame
+
+    def hide(self) -> str:
+        """Return frame erasing the trail"""
+        frame = "".join(self.moves.move_xy(*loc) + " " for loc in self.shown if loc != self.goal)
+        self.shown = []
+        return frame
@@ -1,46 +1,47 @@
-import copy
+"""The sounds of the game.
+
+Each is loaded the first time it plays and played by the backend of
+`maze_gitb.core.audio`, so importing this loads nothing and needs no
+sound device.
+"""
 import logging
 import os
-import time
-
-from openal import oalOpen
 
+from maze_gitb.core.audio import Voice, voice
+from maze_gitb.core.scheduler import timers
 from maze_gitb.utils import Vec  # type: ignore
 
 dirname = os.path.dirname(__file__)
 
-enter_box_sound = oalOpen(os.path.join(dirname, "..", "sound/enter_box.wav"))
-hit_wall_sound = oalOpen(os.path.join(dirname, "..", "sound/hit_wall.wav"))
-level_up_sound = oalOpen(os.path.join(dirname, "..", "sound/level_up.wav"))
-bgm = oalOpen(os.path.join(dirname, "..", "sound/bgm.wav"))
-start_screen_music = oalOpen(os.path.join(dirname, "..", "sound/start.wav"))
-wind_sound = oalOpen(os.path.join(dirname, "..", "sound/wind.wav"))
 
-echo = oalOpen(os.path.join(dirname, "..", "sound/first_echo.wav"))
-echo_2 = oalOpen(os.path.join(dirname, "..", "sound/second_echo.wav"))
+def sound(name: str) -> Voice:
+    """Return the voice of sound/name"""
+    return voice(os.path.join(dirname, "..", "sound", name))
 
 
 def play_enter_box_sound() -> None:
     """Sound effect for entering a box"""
     # https://mixkit.co/free-sound-effects/
-    enter_box_sound.play()
+    sound("enter_box.wav").play()
 
 
 def play_hit_wall_sound(direction: Vec) -> None:
     """Sound effect for hitting a wall"""
     # https://mixkit.co/free-sound-effects/
-    hit_wall_sound.set_position((direction.x, 0, direction.y))
-    hit_wall_sound.play()
+    hit_wall = sound("hit_wall.wav")
+    hit_wall.set_position((direction.x, 0, direction.y))
+    hit_wall.play()
 
 
 def play_level_up_sound() -> None:
     """Sound effect for hitting a wall"""
     # https://mixkit.co/free-sound-effects/
-    level_up_sound.play()
+    sound("level_up.wav").play()
 
 
 def play_bgm() -> None:
     """Play bgm"""
+    bgm = sound("bgm.wav")
     bgm.set_looping(True)
     bgm.set_gain(0.2)
     bgm.play()
@@ -48,18 +49,19 @@ def play_bgm() -> None:
 
 def stop_bgm() -> None:
     """Stop bgm"""
-    bgm.stop()
+    sound("bgm.wav").stop()
 
 
 def play_start_bgm() -> None:
     """Play start scene music"""
+    start_screen_music = sound("start.wav")
     start_screen_music.set_looping(True)
     start_screen_music.play()
 
 
 def stop_start_bgm() -> None:
     """End start scene music"""
-    start_screen_music.stop()
+    sound("start.wav").stop()
 
 
 def enter_game_sound() -> None:
@@ -69,25 +71,23 @@ def enter_game_sound() -> None:
 
 
 def play_echo(direction: Vec, distance: int) -> None:
-    """Play first echo sound effect"""
-    k = copy.copy(direction)
+    """Play first echo sound effect, the second one follows later the further the wall is"""
     if direction.x != 0:
-        k.x += int(distance) * 0.7
+        k = direction + (int(distance) * 0.7, 0)
     else:
-        k.y += int(distance) * 0.7
+        k = direction + (0, int(distance) * 0.7)
     logging.info(f"{k.x}, {k.y}")
-    echo.play()
-    time.sleep(abs(distance) / 5)
-    play_echo_2(direction, distance)
+    sound("first_echo.wav").play()
+    timers.after(abs(distance) / 5, play_echo_2, direction, distance)
 
 
 def play_echo_2(direction: Vec, distance: int) -> None:
     """Play second echo sound effect"""
-    k = copy.copy(direction)
     if direction.x != 0:
-        k.x += int(distance)
+        k = direction + (int(distance), 0)
     else:
-        k.y += int(distance)
+        k = direction + (0, int(distance))
     logging.info(f"{k.x}, {k.y}")
+    echo_2 = sound("second_echo.wav")
     echo_2.set_position((k.x, 0, k.y))
     echo_2.play()
@@ -0,0 +1,182 @@
+"""The terminal the game is drawn on.
+
+Every module draws with the terminal `get_terminal` returns, which is the
+terminal of the session using it, see `maze_gitb.core.session`. With
+`MAZE_GITB_HEADLESS` set to a size like `120x40`, or after
+`use_headless(120, 40)`, that is a `HeadlessTerminal`, which gives the same
+escape sequences without a TTY. Either has to happen before the game modules
+are imported, since some of them lay things out when they load. A server
+gives each session its terminal with `use_terminal`.
+"""
+import io
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple, TypeVar, Union
+
+import blessed
+from blessed.keyboard import Keystroke, resolve_sequence
+
+from maze_gitb.core.session import SessionLocal
+
+HEADLESS = "MAZE_GITB_HEADLESS"
+
+T = TypeVar("T", bound=blessed.Terminal)
+
+
+class HeadlessTerminal(blessed.Terminal):
+    """Terminal of a fixed size that isn't attached to a TTY.
+
+    Keys come from `press` instead of the keyboard.
+    """
+
+    def __init__(self, width: int = 120, height: int = 40, kind: str = "xterm-256color"):
+        super().__init__(kind=kind, stream=io.StringIO(), force_styling=True)
+        self._size = (width, height)
+        self.keys: Deque[Keystroke] = deque()
+
+    @property
+    def width(self) -> int:
+        """Get width of the terminal"""
+        return self._size[0]
+
+    @property
+    def height(self) -> int:
+        """Get height of the terminal"""
+        return self._size[1]
+
+    def press(self, *keys: Union[str, Keystroke]) -> None:
+        """Queue keys for `inkey`, as keystrokes or as what the keyboard sends, like "\\x1b[A" for up"""
+        for key in keys:
+            if not isinstance(key, Keystroke):
+                key = resolve_sequence(key, self._keymap, self._keycodes)
+            self.keys.append(key)
+
+    def keystrokes(self, text: str) -> List[Keystroke]:
+        """Return the keys in what the keyboard sent, like "\\x1b[Aq" for up and q"""
+        keys = []
+        while text:
+            key = resolve_sequence(text, self._keymap, self._keycodes)
+            keys.append(key)
+            text = text[len(key) or 1:]
+        return keys
+
+    def resize(self, width: int, height: int) -> None:
+        """Change the size of the terminal"""
+        self._size = (width, height)
+
+    def inkey(self, timeout: float = None, esc_delay: float = 0.35) -> Keystroke:
+        """Return the next key pressed, or an empty keystroke after timeout"""
+        if self.keys:
+            return self.keys.popleft()
+        if timeout is None:
+            # a real terminal would wait forever
+            raise EOFError("No more keys were pressed")
+        time.sleep(timeout)
+        return Keystroke()
+
+
+def parse_size(value: str) -> Tuple[int, int]:
+    """Return (width, height) of a size like 120x40"""
+    try:
+        width, height = (int(n) for n in value.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"{HEADLESS} should be a size like 120x40, not {value!r}") from None
+    return width, height
+
+
+def _default() -> blessed.Terminal:
+    """Return the terminal of a session that wasn't given one"""
+    size = os.environ.get(HEADLESS)
+    return HeadlessTerminal(*parse_size(size)) if size else blessed.Terminal()
+
+
+_terminal: SessionLocal[blessed.Terminal] = SessionLocal(_default)
+
+
+def use_terminal(terminal: T) -> T:
+    """Draw on terminal in this session from now on, and return it"""
+    _terminal.set(terminal)
+    return terminal
+
+
+def use_headless(width: int = 120, height: int = 40) -> HeadlessTerminal:
+    """Draw on a headless terminal of the given size from now on, and return it"""
+    terminal = _terminal.find()
+    if terminal is not None and not isinstance(terminal, HeadlessTerminal):
+        raise RuntimeError("The game is already drawing on a real terminal")
+    if terminal is None:
+        return use_terminal(HeadlessTerminal(width, height))
+    # modules keep the terminal they got, so it changes size in place
+    terminal.resize(width, height)
+    return terminal
+
+
+def current_terminal() -> blessed.Terminal:
+    """Return the terminal of this session itself, for checks like isinstance"""
+    return _terminal.get()
+
+
+def get_terminal() -> blessed.Terminal:
+    """Return the terminal of the session using it, which modules can keep"""
+    return _terminal  # type: ignore
+
+
+def _template(sequence: str, numbers: Dict[str, int]) -> Optional[Tuple[str, int]]:
+    """Return sequence as a format string with a field for each of numbers, and what terminfo added to them"""
+    escaped = sequence.replace("{", "{{").replace("}", "}}")
+    for offset in (0, 1):
+        found = {name: str(number + offset) for name, number in numbers.items()}
+        if all(escaped.count(digits) == 1 for digits in found.values()):
+            for name, digits in found.items():
+                escaped = escaped.replace(digits, "{" + name + "}")
+            return escaped, offset
+    return None
+
+
+class CursorMoves:
+    """`move_xy` and `move_right` of a terminal, from format strings.
+
+    blessed works out a parameterised sequence from terminfo on every new
+    set of numbers, which can take half a millisecond, and encoding a maze
+    map moves the cursor once per run of walls. Here each sequence is
+    worked out twice, to make the format string and to check it. A
+    terminal whose sequences don't have the numbers in them is asked every
+    time.
+    """
+
+    def __init__(self, terminal: blessed.Terminal) -> None:
+        self.terminal = terminal
+        self.xy = _template(terminal.move_xy(4321, 8765), {"x": 4321, "y": 8765})
+        if self.xy is not None and self.move_xy(3, 5) != terminal.move_xy(3, 5):
+            self.xy = None
+        self.right = _template(terminal.move_right(4321), {"n": 4321})
+        if self.right is not None and self.move_right(7) != terminal.move_right(7):
+            self.right = None
+
+    def move_xy(self, x: int, y: int) -> str:
+        """Return the sequence moving the cursor to (x, y)"""
+        if self.xy is None:
+            return self.terminal.move_xy(x, y)
+        template, offset = self.xy
+        return template.format(x=x + offset, y=y + offset)
+
+    def move_right(self, n: int) -> str:
+        """Return the sequence moving the cursor n cells right"""
+        if self.right is None:
+            return self.terminal.move_right(n)
+        template, offset = self.right
+        return template.format(n=n + offset)
+
+
+# terminal kind -> its moves, every session on the same kind of terminal shares them
+_moves: Dict[str, CursorMoves] = {}
+
+
+def cursor_moves() -> CursorMoves:
+    """Return the cursor moves of the terminal of this session"""
+    terminal = current_terminal()
+    moves = _moves.get(terminal.kind)
+    if moves is None:
+        moves = _moves[terminal.kind] = CursorMoves(terminal)
+    return moves
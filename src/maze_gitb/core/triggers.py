@@ -0,0 +1,59 @@
+"""Things that happen once when the player reaches a place."""
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from maze_gitb.utils import Vec  # type: ignore
+
+Trigger = Tuple[Tuple[Vec, ...], Callable[[], None]]
+
+
+class Triggers:
+    """Actions indexed by the screen cells that set them off, each fired once.
+
+    Moves are queued with `moved` as they happen and the game loop fires
+    the actions they reached with `dispatch`, so a move costs one append
+    and looking for an action one dict lookup. The queue keeps every move
+    until the next dispatch, as one frame can play any number of keys.
+
+    Example:
+        ```
+        triggers = Triggers()
+        triggers.add([Vec(4, 2), Vec(5, 2)], partial(say, "Press g for a hint"))
+        triggers.moved(player.avi.coords)
+        triggers.dispatch()
+        ```
+    """
+
+    def __init__(self) -> None:
+        self.by_cell: Dict[Vec, Trigger] = {}
+        self.moves: List[Vec] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.by_cell)
+
+    def add(self, cells: Iterable[Vec], action: Callable[[], None]) -> None:
+        """Fire action the first time the player is on any of cells"""
+        trigger = (tuple(cells), action)
+        for cell in trigger[0]:
+            self.by_cell[cell] = trigger
+
+    def moved(self, cell: Vec) -> None:
+        """Note that the player is on cell"""
+        if self.by_cell:
+            self.moves.append(cell)
+
+    def dispatch(self) -> None:
+        """Fire the actions of the cells the player was on since the last dispatch"""
+        moves, self.moves = self.moves, []
+        for move in moves:
+            trigger = self.by_cell.get(move)
+            if trigger is None:
+                continue
+            cells, action = trigger
+            for cell in cells:
+                if self.by_cell.get(cell) is trigger:
+                    del self.by_cell[cell]
+            action()
+
+    def clear(self) -> None:
+        """Forget the moves that weren't dispatched"""
+        self.moves.clear()
@@ -0,0 +1,111 @@
+"""Camera over a world bigger than the terminal."""
+from bisect import bisect_right
+from typing import List, Tuple
+
+from maze_gitb.core.character import CharMatrix
+from maze_gitb.core.terminal import get_terminal
+from maze_gitb.utils import Vec  # type: ignore
+
+term = get_terminal()
+
+
+class Viewport:
+    """Window of the terminal's size onto the world, following the player.
+
+    World locations are screen locations as if the terminal were as big as
+    the world. The view only moves when the player comes within `margin` of
+    its edge, it then centres on the player again. Frames built here are in
+    world locations and only cover what is in view, so their cost depends
+    on the size of the terminal and not on the size of the world. When the
+    terminal changes size, set `size` and `look_at` the player again.
+
+    Example:
+        ```
+        viewport = Viewport(world=Vec(400, 200))
+        if viewport.follow(player.avi.coords):
+            render.set_camera(viewport.offset)
+            render(viewport.clear() + viewport.map(maze.char_matrix))
+        ```
+    """
+
+    def __init__(self, world: Vec, size: Vec = None, margin: Vec = Vec(10, 5)):
+        self.world = world
+        self.size = size or Vec(term.width, term.height)
+        self.margin = margin
+        self.offset = Vec(0, 0)
+
+    def follow(self, loc: Vec) -> bool:
+        """Move the view if loc is too close to its edge, return True if it moved"""
+        x, y = loc - self.offset
+        width, height = self.size
+        if self.margin.x <= x < width - self.margin.x and self.margin.y <= y < height - self.margin.y:
+            return False
+        return self.look_at(loc)
+
+    def look_at(self, loc: Vec) -> bool:
+        """Centre the view on loc as far as the world allows, return True if it moved
+
+        A world smaller than the view is centred in it instead.
+        """
+        offset = Vec(
+            *(
+                min(max(pos - size // 2, 0), world - size) if world >= size else -((size - world) // 2)
+                for pos, size, world in zip(loc, self.size, self.world)
+            )
+        )
+        moved = offset != self.offset
+        self.offset = offset
+        return moved
+
+    def visible(self, loc: Vec, size: Vec = Vec(1, 1)) -> bool:
+        """Return True if any part of the rectangle at loc is in view"""
+        x, y = loc - self.offset
+        return x + size.x > 0 and x < self.size.x and y + size.y > 0 and y < self.size.y
+
+    def _rows(self, top: int, height: int) -> range:
+        """Return the rows from top to top + height that are in view"""
+        return range(max(top, self.offset.y), min(top + height, self.offset.y + self.size.y))
+
+    def _clip(self, x: int, text: str) -> Tuple[int, str]:
+        """Return the part of a row of text at x that is in view, and where it starts"""
+        start = max(self.offset.x - x, 0)
+        return x + start, text[start:self.offset.x + self.size.x - x]
+
+    def clear(self) -> str:
+        """Return frame blanking the view, or the world when it is smaller than the view"""
+        return term.move_xy(*(max(pos, 0) for pos in self.offset)) + term.clear_eos
+
+    def map(self, matrix: CharMatrix) -> str:
+        """Return frame drawing the part of matrix in view, blanks are left as they are"""
+        # terminal capabilities are cached per argument, so moving to a row and then to a column
+        # soon costs nothing, while every new location of the world would need a new `move_xy`
+        frame: List[str] = []
+        left, top = matrix.origin
+        for y in self._rows(top, len(matrix)):
+            frame.append(term.move_y(y))
+            starts, texts = matrix.runs(y - top)
+            # the run that starts last before the view may still reach into it
+            i = max(bisect_right(starts, self.offset.x - left) - 1, 0)
+            while i < len(starts) and left + starts[i] < self.offset.x + self.size.x:
+                x, text = self._clip(left + starts[i], texts[i])
+                if text:
+                    frame.append(term.move_x(x) + text)
+                i += 1
+        return "".join(frame)
+
+    def rectangle(self, top_left: Vec, size: Vec) -> str:
+        """Return frame drawing the part of a box outline in view, like `Boundary.map`"""
+        frame: List[str] = []
+        left, top = top_left
+        right, bottom = top_left + size - 1
+        for y in self._rows(top, size.y):
+            if y in (top, bottom):
+                corners = "┌┐" if y == top else "└┘"
+                x, text = self._clip(left, corners[0] + "─" * (size.x - 2) + corners[1])
+                if text:
+                    frame.append(term.move_y(y) + term.move_x(x) + text)
+            else:
+                for x in (left, right):
+                    if self.offset.x <= x < self.offset.x + self.size.x:
+                        frame.append(term.move_y(y) + term.move_x(x) + "│")
+        return "".join(frame)
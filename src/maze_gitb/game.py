@@ -1,13 +1,25 @@
 """Game components."""
+import asyncio
 import logging
 import os
-from typing import List, Union
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Protocol, Tuple, Union
 
-import blessed
 from blessed.keyboard import Keystroke
 
+from maze_gitb.core.headless import HeadlessDisplay
+from maze_gitb.core.instrument import Instruments
+from maze_gitb.core.keys import KeyRepeat, is_move
 from maze_gitb.core.player import Player
-from maze_gitb.core.render import Render
+from maze_gitb.core.render import FrameWriter, Render
+from maze_gitb.core.scheduler import Scheduler, timers
+from maze_gitb.core.session import SessionLocal
+from maze_gitb.core.terminal import (
+    HeadlessTerminal, current_terminal, get_terminal
+)
+from maze_gitb.utils import Vec  # type: ignore
 
 if "logs" not in os.listdir():
     os.mkdir("logs")
@@ -31,18 +43,43 @@ END = 9
 LEADERBOARD = 10
 INFINITE = 11
 
+# frames the scenes may get ahead of the terminal before they wait for it
+FRAME_QUEUE = 8
+# put in the queue of keys when a headless terminal has no more, or the player left
+EOF = Keystroke("\x04", name="EOF")
 
-term = blessed.Terminal()
+term = get_terminal()
 
-render = Render()
+render: Render = SessionLocal(Render)  # type: ignore
+
+
+class Writer(Protocol):
+    """Where the frames go, like `FrameWriter` or `HeadlessDisplay`"""
+
+    encoding: str
+
+    def write(self, frame: str) -> int:
+        """Write frame and return its size in bytes"""
+
+    def report(self) -> str:
+        """Return frame statistics"""
 
 
 class Scene:
     """This should be subclassed to create each new level.
 
-    The subclass should implement the functions `rest` and `next_frame`
+    The subclass should implement the functions `rest` and `next_frame`,
+    scenes that change over time set `ticks` and implement `tick`. Scenes
+    where the arrow keys move the player implement `moving`, `move` and
+    `show_moves`, so the moves of a frame are drawn once.
+
+    A scene is laid out for the size of the terminal when it is made,
+    `width` and `height`. If the terminal changes size, the camera keeps
+    that layout centred on it and `resize` draws the scene again.
     """
 
+    ticks = False
+
     def __init__(self, col: str = "black", bg_col: str = "peachpuff2"):
         self.height = term.height
         self.width = term.width
@@ -56,9 +93,66 @@ class Scene:
     def next_frame(self, val: Keystroke) -> Union[str, int]:
         """Draw next frame in the scene."""
 
+    def next_frames(self, vals: List[Keystroke]) -> Tuple[Union[str, int], int]:
+        """Draw next frame with all the keys pressed since the last one.
+
+        Return the command of the first key that gave one, and how many of
+        the keys were played, the rest go to the scene the command leads to.
+        """
+        moved = False
+        for used, val in enumerate(vals, 1):
+            if is_move(val) and self.moving():
+                command = self.move(val)
+                moved = True
+            else:
+                if moved and self.moving():
+                    self.show_moves()
+                moved = False
+                command = self.next_frame(val)
+            if command:
+                return command, used
+        # a move that finished the level started the next one, which draws itself
+        if moved and self.moving():
+            self.show_moves()
+        return "", len(vals)
+
+    def moving(self) -> bool:
+        """Return True if the arrow keys move the player with `move` now"""
+        return False
+
+    def waiting(self) -> bool:
+        """Return True while the scene only goes on with ticks, whatever keys are pressed"""
+        return False
+
+    def move(self, val: Keystroke) -> Union[str, int]:
+        """Move the player with an arrow key without drawing it."""
+
+    def show_moves(self) -> None:
+        """Draw the moves made since the last frame."""
+
+    def tick(self) -> Union[str, int]:
+        """Advance the scene by one fixed time step."""
+
+    def __str__(self):
+        return type(self).__name__
+
+    def camera(self) -> Vec:
+        """Return the location of the layout shown at the top left of the terminal"""
+        return (Vec(self.width, self.height) - (term.width, term.height)) // 2
+
+    def resize(self) -> None:
+        """Show the scene on the terminal again after it changed size"""
+        render.set_camera(self.camera())
+        if self.current_frame:
+            render(self.current_frame)
+
 
 class Game:
-    """Main game class. Should be initiated with a list of scenes."""
+    """Main game class. Should be initiated with a list of scenes.
+
+    The frames go to writer, by default the terminal of the session, or a
+    `HeadlessDisplay` of its size if it is headless.
+    """
 
     def __init__(
         self,
@@ -69,6 +163,7 @@ class Game:
         leaderboard: Scene,
         end_scene: Scene,
         credit: Scene,
+        writer: Optional[Writer] = None,
     ) -> None:
         self.scenes = scenes
         self.current_scene_index: int = 0
@@ -80,70 +175,351 @@ class Game:
         self.credit = credit
         self.current_scene: Scene = self.scenes[self.current_scene_index]
         self.player = Player()
+        # set by SIGWINCH, the new size is taken between two frames
+        self.resized = False
+        self.watch_resize = False
+        # the scene that drew the last frame
+        self.played: Scene = self.current_scene
+        terminal = current_terminal()
+        if writer is not None:
+            self.writer = writer
+        elif isinstance(terminal, HeadlessTerminal):
+            self.writer = HeadlessDisplay(terminal.width, terminal.height)
+        else:
+            self.writer = FrameWriter(terminal.stream.fileno())
+        self.scheduler = Scheduler(period=0.05)  # 20 ticks per second
+        self.key_repeat = KeyRepeat.from_environ()
+        # waits for a key across ticks, so a tick doesn't cost a task
+        self.getting: "Optional[asyncio.Future[Keystroke]]" = None
+        # set once EOF came, after the keys before it are played
+        self.ended = False
+        # the keys of a headless terminal, pressed before the game started
+        self.scripted = False
+
+    @property
+    def current_scene(self) -> Scene:
+        """Get the scene being played"""
+        return self._current_scene
+
+    @current_scene.setter
+    def current_scene(self, scene: Scene) -> None:
+        """Set the scene being played, shown where its camera puts it"""
+        self._current_scene = scene
+        render.set_camera(scene.camera())
 
     def run(self) -> None:
-        """Run the main game loop."""
-        with term.cbreak():
-            val = Keystroke()
-            while True:
+        """Run the game until it is quit, see `run_async`"""
+        asyncio.run(self.run_async())
 
-                command = self.current_scene.next_frame(val)
-                # get all the frames and print
-                frame = render.screen()
-                print(frame)
-                if command == NEXT_SCENE:
-                    self.current_scene.reset()
-                    self.current_scene_index += 1
-                    # end game if scenes end
-                    if self.current_scene_index == len(self.scenes):
-                        self.current_scene = self.end
-                        continue
-                    else:
-                        self.current_scene = self.scenes[self.current_scene_index]
+    async def run_async(self, keys: "Optional[asyncio.Queue[Keystroke]]" = None) -> None:
+        """Run the main game loop as tasks talking through queues.
+
+        - `read_keys` puts the keys pressed in a queue as the terminal has
+          them, without blocking.
+        - `simulate` plays the scenes with those keys and the ticks of the
+          scheduler, and queues each frame. The keys that came in since the
+          last frame make one frame together, with the presses of a held
+          arrow key limited by `KeyRepeat`, see `maze_gitb.core.keys`.
+        - `write_frames` writes the frames from another thread, so a slow
+          terminal doesn't hold up the scenes. Frames that queue up while it
+          writes go out together.
+        - `play_sounds` fires the timers, the sounds that come later, on time.
+
+        On a headless terminal the keys pressed beforehand are played one a
+        frame by `next_script` instead, and the game ends with an `EOFError`
+        when they run out. Every frame is timed by `Instruments` and gets
+        the size and the time of the write that took it, see
+        `maze_gitb.core.instrument` for the trace and the HUD.
+
+        A server passes the keys of its player, ending with `EOF`, and makes
+        the game with a writer that has a `drain` coroutine, which is awaited
+        after each write instead of writing from another thread.
+        """
+        terminal = current_terminal()
+        self.instruments = Instruments.from_environ()
+        self.timers_changed = asyncio.Event()
+        read_keys = keys is None
+        self.scripted = read_keys and isinstance(terminal, HeadlessTerminal)
+        if keys is None:
+            keys = asyncio.Queue()
+        frames: "asyncio.Queue[str]" = asyncio.Queue(maxsize=FRAME_QUEUE)
+        loop = asyncio.get_running_loop()
+
+        with terminal.cbreak():
+            if not isinstance(terminal, HeadlessTerminal) and hasattr(signal, "SIGWINCH"):
+                loop.add_signal_handler(signal.SIGWINCH, self.on_resize, keys)
+                self.watch_resize = True
+            tasks = [asyncio.create_task(self.play_sounds())]
+            if read_keys and not self.scripted:
+                tasks.append(asyncio.create_task(self.read_keys(keys)))
+            writing = asyncio.create_task(self.write_frames(frames))
+            try:
+                await self.simulate(keys, frames)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                if self.getting is not None:
+                    self.getting.cancel()
+                if not writing.done():
+                    # the last frames still go out
+                    await frames.put(None)
+                await writing
+                if self.watch_resize:
+                    loop.remove_signal_handler(signal.SIGWINCH)
+                    self.watch_resize = False
+                self.instruments.close()
+                # also when the keys of a headless terminal ran out
+                logging.info(self.writer.report())
+                logging.info(self.scheduler.report())
+                logging.info(self.key_repeat.report())
+                logging.info(self.instruments.report())
+
+    async def read_keys(self, keys: "asyncio.Queue[Keystroke]") -> None:
+        """Put the keys pressed in keys as they come"""
+        terminal = current_terminal()
+        if terminal._keyboard_fd is None:
+            # no keyboard, the scenes only tick
+            return
+        loop = asyncio.get_running_loop()
+
+        def readable() -> None:
+            """Take all the keys the terminal has without waiting for more"""
+            val = terminal.inkey(timeout=0)
+            while val:
+                keys.put_nowait(val)
+                val = terminal.inkey(timeout=0)
+
+        loop.add_reader(terminal._keyboard_fd, readable)
+        try:
+            await asyncio.Future()
+        finally:
+            loop.remove_reader(terminal._keyboard_fd)
+
+    async def simulate(self, keys: "asyncio.Queue[Keystroke]", frames: "asyncio.Queue[str]") -> None:
+        """Play scenes until the game is quit, queueing their frames"""
+        vals: Optional[List[Keystroke]] = [Keystroke()]
+        # keys pressed after the one that changed scenes, for the next scene
+        pending: List[Keystroke] = []
+        while True:
+            command, frame, used = self.play(vals)
+            self.instruments.end(str(self.played), "tick" if vals is None else "key", frame)
+            if frame:
+                await frames.put(frame)
+            # the scene may have added sounds for later
+            self.timers_changed.set()
+            val = None
+            if vals is not None:
+                val = vals[used - 1]
+                pending = vals[used:] + pending
+            running, again, val = self.follow(command, val)
+            if not running:
+                return
+            if again:
+                vals = None if val is None else [val]
+            elif pending:
+                vals, pending = pending, []
+            else:
+                vals = await self.next_keys(keys)
+
+    def play(self, vals: Optional[List[Keystroke]]) -> Tuple[Union[str, int], str, int]:
+        """Play one frame of the current scene with the keys pressed, or a tick if vals is None.
+
+        Return the command of the scene, the frame it drew and how many of
+        the keys it played.
+        """
+        self.instruments.begin()
+        self.played = self.current_scene
+        if self.resized:
+            self.resize()
+        if vals is None:
+            command, used = self.played.tick(), 0
+        else:
+            command, used = self.played.next_frames(vals)
+        self.instruments.updated()
+        # get all the frames and write them in one go
+        frame = render.screen()
+        self.instruments.rendered()
+        return command, frame, used
+
+    def follow(self, command: Union[str, int], val: Union[Keystroke, None]) -> Tuple[bool, bool, Keystroke]:
+        """Change scenes as command says.
+
+        Return whether the game goes on, whether the new scene gets a frame
+        straight away, and the key for that frame.
+        """
+        if command == NEXT_SCENE:
+            self.current_scene.reset()
+            self.current_scene_index += 1
+            # end game if scenes end
+            if self.current_scene_index == len(self.scenes):
+                self.current_scene = self.end
+            else:
+                self.current_scene = self.scenes[self.current_scene_index]
+            return True, True, val
+        elif command == INFINITE:
+            self.current_scene.reset()
+            self.current_scene = self.infinite
+            self.player.score.value += self.current_scene.maze.width * self.current_scene.maze.height
+            self.current_scene.render(hard=True)
+        elif command == RESET:
+            self.current_scene.reset()
+            return True, True, Keystroke()
+        elif command == PAUSE:
+            self.current_scene.reset()
+            self.current_scene = self.pause
+            return True, True, val
+        elif command == PLAY:
+            self.pause.reset()
+            self.current_scene = self.scenes[self.current_scene_index]
+            self.current_scene.render(hard=True)
+            return True, True, val
+        elif command == CREDITS:
+            self.current_scene.reset()
+            self.current_scene = self.credit
+            self.current_scene.next_frame(Keystroke())
+        elif command == TITLE:
+            self.current_scene_index = 0
+            self.current_scene.reset()
+            self.current_scene = self.scenes[0]
+            self.player.score.value = self.player.score.init_value
+            self.current_scene.next_frame(Keystroke())
+        elif command == QUIT or command == LOSE:
+            return False, False, val
+        elif command == LEADERBOARD:
+            self.current_scene.reset()
+            self.current_scene = self.leaderboard
+            # to refresh the leaderboard
+            self.current_scene.first_frame = True
+            self.current_scene.built_once = False
+            return True, True, val
+        elif command == TUTORIAL:
+            self.current_scene.reset()
+            self.current_scene = self.tutorial
+            return True, True, val
+        elif command == END:
+            self.current_scene = self.end
+            self.current_scene.first_frame = True
+            return True, True, val
+        return True, False, val
+
+    async def next_keys(self, keys: "asyncio.Queue[Keystroke]") -> Optional[List[Keystroke]]:
+        """Wait for keys and return all of them, or return None when the current scene is due a tick.
+
+        Scenes that don't tick wait until a key arrives, or until the
+        terminal changes size, which gives an empty key.
+        """
+        if self.scripted:
+            return await self.next_script()
+        if self.ended:
+            raise EOFError("No more keys were pressed")
+        ticks = self.current_scene.ticks
+        if not ticks:
+            self.scheduler.stop()
+        while True:
+            if ticks and self.scheduler.due():
+                return None
+            if self.getting is None and keys.empty():
+                self.getting = asyncio.ensure_future(keys.get())
+            if self.getting is not None:
+                if not self.getting.done():
+                    await asyncio.wait({self.getting}, timeout=self.scheduler.timeout() if ticks else None)
+                    if not self.getting.done():
                         continue
-                elif command == INFINITE:
-                    self.current_scene.reset()
-                    self.current_scene = self.infinite
-                    self.player.score.value += self.current_scene.maze.width * self.current_scene.maze.height
-                    self.current_scene.render(hard=True)
-                elif command == RESET:
-                    self.current_scene.reset()
-                    val = Keystroke()
-                    continue
-                elif command == PAUSE:
-                    self.current_scene.reset()
-                    self.current_scene = self.pause
-                    continue
-                elif command == PLAY:
-                    self.pause.reset()
-                    self.current_scene = self.scenes[self.current_scene_index]
-                    self.current_scene.render(hard=True)
-                    continue
-                elif command == CREDITS:
-                    self.current_scene.reset()
-                    self.current_scene = self.credit
-                    self.current_scene.next_frame(Keystroke())
-                elif command == TITLE:
-                    self.current_scene_index = 0
-                    self.current_scene.reset()
-                    self.current_scene = self.scenes[0]
-                    self.player.score.value = self.player.score.init_value
-                    self.current_scene.next_frame(Keystroke())
-                elif command == QUIT or command == LOSE:
-                    break
-                elif command == LEADERBOARD:
-                    self.current_scene.reset()
-                    self.current_scene = self.leaderboard
-                    # to refresh the leaderboard
-                    self.current_scene.first_frame = True
-                    self.current_scene.built_once = False
-                    continue
-                elif command == TUTORIAL:
-                    self.current_scene.reset()
-                    self.current_scene = self.tutorial
-                    continue
-                elif command == END:
-                    self.current_scene = self.end
-                    self.current_scene.first_frame = True
-                    continue
-                val = term.inkey(timeout=0.05)  # 20 fps
+                # the key it took came before the ones still in the queue
+                vals = [self.getting.result()]
+                self.getting = None
+            else:
+                vals = []
+            while not keys.empty():
+                vals.append(keys.get_nowait())
+            # a Ctrl-D pressed is equal to EOF but isn't it
+            end = next((i for i, val in enumerate(vals) if val is EOF), None)
+            if end is not None:
+                self.ended = True
+                vals = vals[:end]
+            # the empty key of a resize only matters to scenes that wait for keys
+            if ticks:
+                vals = [val for val in vals if val]
+            if vals:
+                return self.key_repeat.coalesce(vals)
+            if self.ended:
+                raise EOFError("No more keys were pressed")
+
+    async def next_script(self) -> Optional[List[Keystroke]]:
+        """Return the next key pressed on the headless terminal, or None when the current scene is due a tick.
+
+        The keys were all pressed before the game started, so each gets a
+        frame of its own once the scene takes keys: the intro of a level
+        ticks by first.
+        """
+        terminal = current_terminal()
+        ticks = self.current_scene.ticks
+        if not ticks:
+            self.scheduler.stop()
+        while ticks:
+            if self.scheduler.due():
+                return None
+            if not self.current_scene.waiting():
+                break
+            await asyncio.sleep(self.scheduler.timeout())
+        if not terminal.keys:
+            raise EOFError("No more keys were pressed")
+        return [terminal.inkey()]
+
+    async def write_frames(self, frames: "asyncio.Queue[str]") -> None:
+        """Write the frames in frames until it gives None"""
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="frames") as executor:
+            while True:
+                frame = await frames.get()
+                batch = [frame]
+                while not frames.empty() and batch[-1] is not None:
+                    batch.append(frames.get_nowait())
+                done = batch[-1] is None
+                if done:
+                    batch.pop()
+                if batch and hasattr(self.writer, "drain"):
+                    start = time.perf_counter()
+                    written = self.writer.write("".join(batch))
+                    await self.writer.drain()
+                    self.instruments.wrote(len(batch), written, time.perf_counter() - start)
+                elif batch:
+                    written, seconds = await loop.run_in_executor(executor, self.write_timed, "".join(batch))
+                    self.instruments.wrote(len(batch), written, seconds)
+                if done:
+                    return
+
+    def write_timed(self, frame: str) -> Tuple[int, float]:
+        """Write frame and return the number of bytes written and the seconds it took"""
+        start = time.perf_counter()
+        written = self.writer.write(frame)
+        return written, time.perf_counter() - start
+
+    async def play_sounds(self) -> None:
+        """Fire the timers when they are due, waking up when a scene may have added one"""
+        while True:
+            timers.fire()
+            self.timers_changed.clear()
+            try:
+                await asyncio.wait_for(self.timers_changed.wait(), timers.timeout())
+            except asyncio.TimeoutError:
+                pass
+
+    def on_resize(self, keys: "asyncio.Queue[Keystroke]") -> None:
+        """Note that the terminal changed size and wake up a scene that waits for a key"""
+        self.resized = True
+        keys.put_nowait(Keystroke())
+
+    def resize(self) -> None:
+        """Show the current scene on the terminal at its new size.
+
+        Nothing is laid out again, the scene only moves its camera and draws
+        what it already has, so this costs about as much as one full frame.
+        """
+        start = time.perf_counter()
+        self.resized = False
+        render.resize()
+        if isinstance(self.writer, HeadlessDisplay):
+            self.writer.resize(term.width, term.height)
+        self.current_scene.resize()
+        logging.debug(f"resized to {term.width}x{term.height} in {(time.perf_counter() - start) * 1e6:.0f} us")
@@ -1,35 +1,45 @@
-from typing import List
-
-from openal import oalQuit
+from typing import List, Optional
 
+from maze_gitb.core.audio import close_backend
+from maze_gitb.core.render import Render
 from maze_gitb.core.sound import play_start_bgm
-from maze_gitb.game import Game, Scene
+from maze_gitb.game import Game, Scene, Writer
 from maze_gitb.scene import (
-    EndScene, InfiniteLevel, Level, credit_scene, leaderboard_menu, pause_menu,
-    title_scene
+    EndScene, InfiniteLevel, Level, new_credit_menu, new_leaderboard_menu,
+    new_pause_menu, new_title_menu
 )
 
 
-def main() -> None:
-    """Run the main program"""
-    play_start_bgm()
-    scenes: List[Scene] = [title_scene]
+def new_game(writer: Optional[Writer] = None) -> Game:
+    """Return a game with scenes of its own, laid out for the terminal of this session and writing to writer"""
+    # only send the cells that changed between frames
+    Render().use_back_buffer()
+    scenes: List[Scene] = [new_title_menu()]
     scenes.extend([Level(str(i)) for i in range(1, 9)])
     # if len(sys.argv) == 1:
     #     scenes.extend([Level(str(i)) for i in range(1, 9)])
     # else:
     #     scenes.append(Level(sys.argv[1]))
-    game = Game(
+    return Game(
         scenes,
-        pause=pause_menu,
+        pause=new_pause_menu(),
         infinite=InfiniteLevel(True),
-        leaderboard=leaderboard_menu,
+        leaderboard=new_leaderboard_menu(),
         tutorial=Level("0"),
         end_scene=EndScene(),
-        credit=credit_scene,
+        credit=new_credit_menu(),
+        writer=writer,
     )
-    game.run()
-    oalQuit()
+
+
+def main() -> None:
+    """Run the main program"""
+    game = new_game()
+    play_start_bgm()
+    try:
+        game.run()
+    finally:
+        close_backend()
 
 
 if __name__ == "__main__":
@@ -1,31 +1,36 @@
 """Examples for designing levels."""
+import asyncio
 import json
 import logging
 import os
-import time
-from copy import copy
+from functools import partial
 from random import randrange
-from threading import Thread
-from typing import Callable, Dict, List, Union
+from typing import Callable, List, Optional, Union
 
-import blessed
 from blessed.keyboard import Keystroke
 
+from maze_gitb.core.keys import is_move
 from maze_gitb.core.maze import AIR, Box, Maze
 from maze_gitb.core.player import MenuCursor, Player
 from maze_gitb.core.render import Render
+from maze_gitb.core.scheduler import timers
+from maze_gitb.core.session import SessionLocal, build_in_thread
+from maze_gitb.core.solver import Hint
 from maze_gitb.core.sound import (
     enter_game_sound, play_level_up_sound, stop_bgm
 )
 from maze_gitb.core.table import make_table
+from maze_gitb.core.terminal import get_terminal
+from maze_gitb.core.triggers import Triggers
+from maze_gitb.core.viewport import Viewport
 from maze_gitb.game import (
     CREDITS, END, INFINITE, LEADERBOARD, LOSE, NEXT_SCENE, PAUSE, PLAY, QUIT,
     RESET, TITLE, TUTORIAL, Scene
 )
 from maze_gitb.utils import Boundary, Vec  # type: ignore
 
-term = blessed.Terminal()
-render = Render()
+term = get_terminal()
+render: Render = SessionLocal(Render)  # type: ignore
 
 
 class Menu(Scene):
@@ -50,6 +55,9 @@ class Menu(Scene):
         self.current_frame: str = ""
         self.menu: MenuCursor = None
 
+    def __str__(self):
+        return f"Menu {self.txt[0]}"
+
     def build(self) -> None:
         """Build self.txt"""
         if self.action_on_first_frame and not self.built_once:
@@ -99,7 +107,14 @@ class Menu(Scene):
         """Reset has no use for title scene."""
         self.first_frame = True
         self.menu.selected = 0
-        self.menu.coords = copy(self.menu.l_bounds)
+        self.menu.coords = self.menu.l_bounds
+
+    def resize(self) -> None:
+        """Show the menu again after the terminal changed size, as it was"""
+        render.set_camera(self.camera())
+        if not self.first_frame:
+            render(self.current_frame)
+            self.menu.render()
 
 
 dirname = os.path.dirname(__file__)
@@ -108,21 +123,27 @@ dirname = os.path.dirname(__file__)
 class Level(Scene):
     """First basic game"""
 
+    ticks = True
+
     def __init__(self, level: str = "1") -> None:
         super().__init__()
+        self.level = level
 
         with open(os.path.join(dirname, f"levels/{level}.json"), "r") as f:
             data = json.load(f)
 
-        self.instructions: Dict = {}
         self.dialogues = data.pop("dialogues", None)
-        if self.dialogues:
-            for dialogue in self.dialogues:
-                hit_point, coordinate, text = dialogue
-                self.instructions[tuple(hit_point)] = [coordinate, text]
-
         self.maze = Maze.load(data=data)
 
+        # instructions shown when the player reaches a cell of the maze, each cell is two characters wide
+        self.instructions = Triggers()
+        for hit_point, coordinate, text in self.dialogues or []:
+            cell = self.maze.mat2screen(hit_point)
+            self.instructions.add((cell, cell + (1, 0)), partial(self.instruct_player, coordinate, text))
+        # the instruction on screen and where it is
+        self.prev_text = ""
+        self.prev_text_loc: Vec = None
+
         self.level_boundary = Boundary(
             len(self.maze.char_matrix[0]),
             len(self.maze.char_matrix),
@@ -136,6 +157,8 @@ class Level(Scene):
         self.wait = self.show_level
         self.maze_is_visible = False
         self.reward_on_goal = 0
+        self.hint = Hint(self.maze, self.end_loc)
+        self.hint_is_visible = False
 
         self.player: Player = Player()
 
@@ -145,10 +168,15 @@ class Level(Scene):
             box.loc = self.maze.mat2screen(box.loc) - (1, 1)
             self.player.inside_box[box.col] = False
 
+    def __str__(self):
+        return f"Level {self.level}"
+
     def build_level(self) -> None:
         """Load current level specific attributes"""
-        self.player.start_loc = copy(self.maze.start)
+        self.player.start_loc = self.maze.start
         self.player.collision_count = 0
+        # the level stays laid out for this size when the terminal changes size
+        self.player.avi.area = Vec(self.width, self.height)
         self.reward_on_goal = 200
 
     def next_frame(self, val: Keystroke) -> Union[str, int]:
@@ -165,31 +193,27 @@ class Level(Scene):
             frame = self.get_boundary_frame()  # type: ignore
             frame += self.maze.map
             render(frame)
-            for box in self.maze.boxes:
-                box.render(self.player)
+            self.draw_boxes(cleared=True)
             self.player.start()
             return ""
 
         elif self.wait > 0:
-            # block any actions from player and then remove maze
-            if self.instructions and self.wait == self.show_level:
-                Thread(target=self.instruct_player, daemon=True).start()
-            self.wait -= 1
-            if self.wait == 0:
-                self.remove_maze(0)
+            # block any actions from player until `tick` removes the maze
+            pass
 
-        elif val.is_sequence and (257 < val.code < 262):
-            # update player
-            self.player.update(val, self.maze)
-            # check if game ends
-            if all(self.player.avi.coords == self.end_loc):
-                self.player.score.value += self.reward_on_goal
+        elif is_move(val):
+            if self.move(val):
                 return NEXT_SCENE
-            if self.instructions:
-                Thread(target=self.instruct_player, daemon=True).start()
-            self.render()
+            self.show_moves()
         elif val.lower() == "e":
             self.player.player_movement_sound(maze=self.maze)
+        elif val.lower() == "g":
+            self.hint_is_visible = not self.hint_is_visible
+            if self.hint_is_visible:
+                render(self.hint.show(self.player.avi.coords))
+            else:
+                render(self.hint.hide())
+            self.render()
         elif val.lower() == "q":
             return PAUSE
         elif val.lower() == "r":
@@ -198,17 +222,59 @@ class Level(Scene):
             if not self.maze_is_visible:
                 self.maze_is_visible = True
                 render(self.maze.map)
-                for box in self.maze.boxes:
-                    box.render(self.player)
+                self.draw_boxes(cleared=True)
                 self.player.render()
             else:
                 self.remove_maze(0)
 
-        # things that should update on every frame goes here
-        if not self.wait > 0:
-            self.player.score.update(
-                player_inside_box=any(self.player.inside_box.values())
-            )
+        if self.player.score.value <= 0:
+            return LOSE
+        return ""
+
+    def moving(self) -> bool:
+        """Return True once the maze was shown"""
+        return not self.first_act and self.wait <= 0
+
+    def waiting(self) -> bool:
+        """Return True until the maze was shown"""
+        return not self.moving()
+
+    def move(self, val: Keystroke) -> Union[str, int]:
+        """Move the player with an arrow key, NEXT_SCENE if that reached the end"""
+        self.player.update(val, self.maze)
+        # check if game ends
+        if self.player.avi.coords == self.end_loc:
+            self.player.score.value += self.reward_on_goal
+            return NEXT_SCENE
+        self.instructions.moved(self.player.avi.coords)
+        return ""
+
+    def show_moves(self) -> None:
+        """Draw the player where the moves took it, and the instructions it reached"""
+        if self.hint_is_visible:
+            render(self.hint.show(self.player.avi.coords))
+        self.render()
+        self.instructions.dispatch()
+
+    def tick(self) -> Union[str, int]:
+        """Advance the level by one time step, whether or not a key was pressed."""
+        if self.first_act:
+            return self.next_frame(Keystroke())
+
+        if self.wait > 0:
+            # show the maze for a while and then remove it
+            if self.wait == self.show_level:
+                self.instructions.moved(self.player.avi.coords)
+                self.instructions.dispatch()
+            self.wait -= 1
+            if self.wait == 0:
+                self.remove_maze(0)
+            return ""
+
+        # things that should update on every tick goes here
+        self.player.score.update(
+            player_inside_box=any(self.player.inside_box.values())
+        )
         if self.player.score.value <= 0:
             return LOSE
         return ""
@@ -217,20 +283,50 @@ class Level(Scene):
         """Refreshing the scene"""
         if hard:
             render(term.clear, bg_col="lightskyblue1")
-        for box in self.maze.boxes:
-            box.render(self.player)
+        self.draw_boxes(cleared=hard)
         render(self.level_boundary.map)
         # render player
         render(term.move_xy(*self.end_loc) + "&")
         self.player.render()
+        if hard:
+            self.player.score.render()
 
-    def remove_maze(self, sleep: float = 2) -> None:
-        """Erase main maze"""
+    def remove_maze(self, delay: float = 0) -> None:
+        """Erase main maze, after delay seconds without holding up the game"""
+        if delay:
+            timers.after(delay, self.remove_maze)
+            return
         self.maze_is_visible = False
-        time.sleep(sleep)
         render(self.get_boundary_frame())
+        if self.hint_is_visible:
+            render(self.hint.show(self.player.avi.coords))
         self.player.render()
+        self.draw_boxes(cleared=True)
+        self.player.score.render()
+
+    def resize(self) -> None:
+        """Draw the level again after the terminal changed size, from the maps it already has"""
+        render.set_camera(self.camera())
+        if self.first_act:
+            # the first frame draws everything
+            return
+        frame = self.get_boundary_frame()
+        if self.maze_is_visible or self.wait > 0:
+            frame += self.maze.map
+        render(frame)
+        if self.hint_is_visible:
+            render(self.hint.show(self.player.avi.coords))
+        if self.prev_text:
+            render(term.move_xy(*self.prev_text_loc) + self.prev_text)
+        self.draw_boxes(cleared=True)
+        self.player.render()
+        self.player.score.render()
+
+    def draw_boxes(self, cleared: bool = False) -> None:
+        """Draw the boxes, and their maps again if they were `cleared` or drawn over"""
         for box in self.maze.boxes:
+            if cleared:
+                box.needs_cleaning = False
             box.render(self.player)
 
     def get_boundary_frame(self) -> str:
@@ -243,28 +339,23 @@ class Level(Scene):
     def reset(self) -> None:
         """Reset this level"""
         for box in self.maze.boxes:
-            box.needs_cleaning = False
+            box.leave(self.player)
         self.player.start()
         self.first_act = True
-
-    global prev_text, prev_text_loc
-    prev_text, prev_text_loc = "", ""
-
-    def instruct_player(self) -> None:
-        """Instructions"""
-        global prev_text, prev_text_loc
-        player_loc = tuple(self.maze.screen2mat(self.player.avi.coords))
-        if player_loc not in self.instructions.keys():
-            return
-        if prev_text != "":
-            frame = term.move_xy(*prev_text_loc) + " " * len(prev_text)
+        self.hint_is_visible = False
+        self.hint.shown = []
+        self.instructions.clear()
+
+    def instruct_player(self, coordinate: List[int], text: str) -> None:
+        """Show text at coordinate of the maze, instead of the previous instruction"""
+        if self.prev_text != "":
+            frame = term.move_xy(*self.prev_text_loc) + " " * len(self.prev_text)
             render(frame)
-        coordinate, text = self.instructions.pop(player_loc)
         text_loc = self.maze.mat2screen(coordinate)
         frame = term.move_xy(*text_loc) + text
         render(frame)
-        prev_text = text
-        prev_text_loc = text_loc
+        self.prev_text = text
+        self.prev_text_loc = text_loc
         # time.sleep(2)
         # frame = term.move_xy(*text_loc) + " " * len(text)
         # render(frame)
@@ -275,88 +366,190 @@ class Level(Scene):
 
 
 class InfiniteLevel(Scene):
-    """Infinite level of maze"""
+    """Infinite level of maze
+
+    The maze is `size` cells big, by default as big as fits the terminal,
+    and made by `algorithm`. Each level passes these on to the next, so
+    the next mazes of a session are made the same way and other sessions
+    keep their own. Bigger mazes are seen through a camera that follows
+    the player, and only what is in view is drawn. While a maze is played
+    the next one is built on another thread, see `prepare_next`, so
+    reaching the end doesn't hold up the other games of a server.
+    """
 
-    instance = None
-    random = None
+    ticks = True
 
-    def __init__(self, random_pos: bool) -> None:
-        global random
+    # the level with the maze played in this session, there is a new one for every maze
+    playing: "SessionLocal[InfiniteLevel]" = SessionLocal()
+    # the future of the next maze of this session, None while none is being built
+    upcoming: "SessionLocal[Optional[asyncio.Future[Maze]]]" = SessionLocal(lambda: None)
+    # longest the maze is shown at the start, in ticks
+    max_show_level = 200
+
+    def __init__(
+        self, random_pos: bool, algorithm: str = "backtracker", size: Vec = None, maze: Maze = None
+    ) -> None:
         super().__init__()
         self.player: Player = Player()
-        if type(self).instance is None:
-            self.maze = Maze.generate(term.width // 5, term.height // 3, random_pos=random_pos)
-            random = random_pos
-            # self.maze = Maze.generate(7, 7, random_pos=random_pos)
-            self.generate_boxes()
-            self.level_boundary = Boundary(
-                len(self.maze.char_matrix[0]),
-                len(self.maze.char_matrix),
-                self.maze.top_left_corner,
-                term,
-            )
+        self.random_pos = random_pos
+        self.algorithm = algorithm
+        self.size = size
+        if self.instance is None:
+            self.maze = maze or self.new_maze(random_pos, algorithm, size)
+            self.maze_shape = Vec(len(self.maze.char_matrix[0]), len(self.maze.char_matrix))
+            # as much room around the maze as on the top and left
+            self.viewport = Viewport(world=self.maze.top_left_corner * 2 + self.maze_shape)
+            self.boxes_in_view: List[Box] = self.maze.boxes
             self.end_loc = self.maze.mat2screen(self.maze.end)
             self.first_act = True  # set up what to do at the start of the level
             self.show_level = 40  # number of frames to show the level
             self.wait = self.show_level
             self.maze_is_visible = False
             self.reward_on_goal = 0
+            self.hint = Hint(self.maze, self.end_loc)
+            self.hint_is_visible = False
 
             for box in self.maze.boxes:
-                # move to top-left corner of maze + scale and extend width
-                # + move to top-left corner of box
-                box.loc = self.maze.mat2screen(box.loc) - (1, 1)
                 self.player.inside_box[box.col] = False
 
-            type(self).instance = self
+            self.playing.set(self)
         else:
             logging.error(
                 RuntimeError("Only one instance of 'Infinitelevel' can exist at a time")
             )
 
+    @staticmethod
+    def maze_size(size: Optional[Vec]) -> Vec:
+        """Return the size of a maze in cells, size or as big as fits the terminal"""
+        return Vec(*(size or (term.width // 5, term.height // 3)))
+
+    @classmethod
+    def new_maze(cls, random_pos: bool, algorithm: str, size: Optional[Vec]) -> Maze:
+        """Return a new maze with its boxes.
+
+        Only reads the terminal of the session, so it can be built on another thread.
+        """
+        width, height = cls.maze_size(size)
+        maze = Maze.generate(width, height, random_pos=random_pos, algorithm=algorithm)
+        # self.maze = Maze.generate(7, 7, random_pos=random_pos)
+        cls.generate_boxes(maze)
+        for box in maze.boxes:
+            # move to top-left corner of maze + scale and extend width
+            # + move to top-left corner of box
+            box.loc = maze.mat2screen(box.loc) - (1, 1)
+        return maze
+
+    def prepare_next(self) -> None:
+        """Start building the next maze on another thread, unless it is or there is no event loop"""
+        if self.upcoming.get() is None:
+            level = self.instance
+            try:
+                self.upcoming.set(build_in_thread(self.new_maze, level.random_pos, level.algorithm, level.size))
+            except RuntimeError:
+                # the next maze is built when it is needed
+                pass
+
+    @classmethod
+    def take_next(cls, size: Optional[Vec]) -> Optional[Maze]:
+        """Return the next maze if it is built and still fits, None to build one now"""
+        upcoming = cls.upcoming.get()
+        if upcoming is None or not upcoming.done():
+            # one that is still being built is taken next time
+            return None
+        cls.upcoming.set(None)
+        if upcoming.cancelled():
+            return None
+        if upcoming.exception() is not None:
+            logging.error(RuntimeError(f"Couldn't build the next maze: {upcoming.exception()}"))
+            return None
+        maze = upcoming.result()
+        if (maze.width, maze.height) != cls.maze_size(size):
+            # the terminal changed size
+            return None
+        return maze
+
+    @property
+    def instance(self) -> "InfiniteLevel":
+        """Get the level with the maze played in this session"""
+        return self.playing.find()
+
     def build_level(self) -> None:
         """Load current level specific attributes"""
         self.player.start_loc = self.maze.mat2screen(mat=self.instance.maze.start)
         self.player.collision_count = 0
+        self.player.avi.area = self.instance.viewport.world
         self.instance.reward_on_goal = self.instance.maze.width * self.instance.maze.height
+        self.instance.viewport.look_at(self.player.start_loc)
+        self.move_camera()
+
+    def camera(self) -> Vec:
+        """Return the location of the world shown at the top left of the terminal"""
+        return self.instance.viewport.offset
+
+    def resize(self) -> None:
+        """Fit the view to the terminal after it changed size and draw it again"""
+        viewport = self.instance.viewport
+        viewport.size = Vec(term.width, term.height)
+        viewport.look_at(self.player.avi.coords)
+        if self.instance.first_act:
+            render.set_camera(viewport.offset)
+            return
+        self.move_camera()
+        render(term.clear, bg_col="lightskyblue1")
+        if self.instance.maze_is_visible or self.instance.wait > 0:
+            render(viewport.map(self.instance.maze.char_matrix))
+        if self.instance.hint_is_visible:
+            render(self.instance.hint.show(self.player.avi.coords))
+        self.render()
+        self.player.score.render()
+
+    def move_camera(self) -> None:
+        """Show the view of the viewport and note the boxes in it"""
+        viewport = self.instance.viewport
+        render.set_camera(viewport.offset)
+        for box in self.instance.boxes_in_view:
+            # the view is drawn again from scratch
+            box.needs_cleaning = False
+        self.instance.boxes_in_view = [box for box in self.instance.maze.boxes if viewport.visible(box.loc, box.shape)]
 
     def next_frame(self, val: Keystroke) -> Union[str, int]:
         """Draw next frame."""
         if self.instance.first_act:
             self.instance.first_act = False
             time = self.maze.width * self.maze.height // 6.7
-            self.instance.show_level = time if time > 30 else 30
+            self.instance.show_level = min(max(time, 30), self.max_show_level)
             self.instance.wait = self.instance.show_level
             self.build_level()
+            self.prepare_next()
 
             play_level_up_sound()
             # removes the main maze after 2 sec
             frame = self.get_boundary_frame()
-            frame += self.instance.maze.map
+            frame += self.instance.viewport.map(self.instance.maze.char_matrix)
             render(frame)
-            for box in self.instance.maze.boxes:
-                box.render(self.player)
+            self.draw_boxes(cleared=True)
             self.player.start()
             return ""
 
         elif self.instance.wait > 0:
-            # block any actions from player and then remove maze
-            self.instance.wait -= 1
-            if self.instance.wait == 0:
-                self.remove_maze(0)
+            # block any actions from player until `tick` removes the maze
+            pass
 
-        elif val.is_sequence and (257 < val.code < 262):
-            # update player
-            self.player.update(val, self.instance.maze)
-            # check if game ends
-            if all(self.player.avi.coords == self.instance.end_loc):
-                self.player.score.value += self.instance.reward_on_goal
-                self.instance.reset_cls()
-                self.instance.next_frame(Keystroke())
+        elif is_move(val):
+            self.move(val)
+            if not self.moving():
+                # the move reached the end and started the next maze
                 return
-            self.render()
+            self.show_moves()
         elif val.lower() == "e":
             self.player.player_movement_sound(maze=self.maze)
+        elif val.lower() == "g":
+            self.instance.hint_is_visible = not self.instance.hint_is_visible
+            if self.instance.hint_is_visible:
+                render(self.instance.hint.show(self.player.avi.coords))
+            else:
+                render(self.instance.hint.hide())
+            self.render()
         elif val.lower() == "q":
             self.instance.reset_cls()
             self.player.score.value -= self.instance.reward_on_goal
@@ -367,19 +560,60 @@ class InfiniteLevel(Scene):
         elif val.lower() == "h":
             if not self.instance.maze_is_visible:
                 self.instance.maze_is_visible = True
-                render(self.instance.maze.map)
-                for box in self.instance.maze.boxes:
-                    box.render(self.player)
+                render(self.instance.viewport.map(self.instance.maze.char_matrix))
+                self.draw_boxes(cleared=True)
                 render(term.move_xy(*self.instance.end_loc) + "&")
                 self.instance.player.render()
             else:
                 self.instance.remove_maze(0)
 
-        # things that should update on every frame goes here
-        if not self.instance.wait > 0:
-            self.player.score.update(
-                player_inside_box=any(self.player.inside_box.values())
-            )
+        if self.player.score.value <= 0:
+            return LOSE
+        return ""
+
+    def moving(self) -> bool:
+        """Return True once the maze was shown"""
+        return not self.instance.first_act and self.instance.wait <= 0
+
+    def waiting(self) -> bool:
+        """Return True until the maze was shown"""
+        return not self.moving()
+
+    def move(self, val: Keystroke) -> Union[str, int]:
+        """Move the player with an arrow key, going on to a new maze if that reached the end"""
+        self.player.update(val, self.instance.maze)
+        # check if game ends
+        if self.player.avi.coords == self.instance.end_loc:
+            self.player.score.value += self.instance.reward_on_goal
+            self.instance.reset_cls()
+            self.instance.next_frame(Keystroke())
+        return ""
+
+    def show_moves(self) -> None:
+        """Draw the player where the moves took it, moving the camera if it got near an edge"""
+        if self.instance.viewport.follow(self.player.avi.coords):
+            self.move_camera()
+            self.redraw()
+        if self.instance.hint_is_visible:
+            render(self.instance.hint.show(self.player.avi.coords))
+        self.render()
+
+    def tick(self) -> Union[str, int]:
+        """Advance the level by one time step, whether or not a key was pressed."""
+        if self.instance.first_act:
+            return self.next_frame(Keystroke())
+
+        if self.instance.wait > 0:
+            # show the maze for a while and then remove it
+            self.instance.wait -= 1
+            if self.instance.wait == 0:
+                self.remove_maze(0)
+            return ""
+
+        # things that should update on every tick goes here
+        self.player.score.update(
+            player_inside_box=any(self.player.inside_box.values())
+        )
         if self.player.score.value <= 0:
             return LOSE
         return ""
@@ -387,48 +621,66 @@ class InfiniteLevel(Scene):
     def render(self, hard: bool = False) -> None:
         """Refreshing the scene"""
         if hard:
+            self.move_camera()
             render(term.clear, bg_col="lightskyblue1")
-        for box in self.instance.maze.boxes:
-            box.render(self.player)
-        render(self.instance.level_boundary.map)
+        self.draw_boxes(cleared=hard)
+        render(self.instance.viewport.rectangle(self.instance.maze.top_left_corner, self.instance.maze_shape))
         # render player
         render(term.move_xy(*self.instance.end_loc) + "&")
         self.player.render()
 
-    def remove_maze(self, sleep: float = 2) -> None:
-        """Erase main maze"""
+    def redraw(self) -> None:
+        """Draw the view from scratch after the camera moved, `render` draws the rest"""
+        render(self.instance.viewport.clear())
+        if self.instance.maze_is_visible:
+            render(self.instance.viewport.map(self.instance.maze.char_matrix))
+        self.player.score.render()
+
+    def remove_maze(self, delay: float = 0) -> None:
+        """Erase main maze, after delay seconds without holding up the game"""
+        if delay:
+            timers.after(delay, self.remove_maze)
+            return
         self.instance.maze_is_visible = False
-        time.sleep(sleep)
         render(self.get_boundary_frame())
-        for box in self.instance.maze.boxes:
-            box.render(self.player)
+        if self.instance.hint_is_visible:
+            render(self.instance.hint.show(self.player.avi.coords))
+        self.draw_boxes(cleared=True)
         self.player.render()
+        self.player.score.render()
+
+    def draw_boxes(self, cleared: bool = False) -> None:
+        """Draw the boxes in view, and their maps again if they were `cleared` or drawn over"""
+        for box in self.instance.boxes_in_view:
+            if cleared:
+                box.needs_cleaning = False
+            box.render(self.player)
 
     def get_boundary_frame(self) -> str:
         """Get the frame with only boundary"""
         frame = term.clear
-        frame += self.instance.level_boundary.map
+        frame += self.instance.viewport.rectangle(self.instance.maze.top_left_corner, self.instance.maze_shape)
         frame += term.move_xy(*self.instance.end_loc) + "&"  # type: ignore
         return frame
 
-    def generate_boxes(self) -> None:
-        """Generate boxes"""
-        num_box_x = self.maze.width // 6
-        num_box_y = self.maze.height // 4
+    @staticmethod
+    def generate_boxes(maze: Maze) -> None:
+        """Generate the boxes of maze"""
+        num_box_x = maze.width // 6
+        num_box_y = maze.height // 4
         if num_box_y == 0:
             num_box_y = 1
         if num_box_x == 0:
             num_box_x = 1
         radius = (
-            max(self.maze.width * 2 // num_box_x, self.maze.height // num_box_y) + 3
+            max(maze.width * 2 // num_box_x, maze.height // num_box_y) + 3
         )
         number_of_box = num_box_x * num_box_y
         box_list = []
-        logging.debug("radius {}".format(radius))
-        logging.debug("width:" + str(self.maze.width))
-        logging.debug("height:" + str(self.maze.height))
-        logging.debug("number of box:" + str(number_of_box))
-        logging.debug("\n" + str(self.maze))
+        logging.debug("radius %s", radius)
+        logging.debug("width: %s", maze.width)
+        logging.debug("height: %s", maze.height)
+        logging.debug("number of box: %s", number_of_box)
         for y in range(0, num_box_y):
             for x in range(0, num_box_x):
                 box_pos = None
@@ -436,40 +688,43 @@ class InfiniteLevel(Scene):
                     box_pos is None
                     or box_pos.x < 2
                     or box_pos.y < 2
-                    or box_pos.y > len(self.maze.matrix[1]) - 2
-                    or box_pos.x > len(self.maze.matrix) - 2
-                    or self.maze.matrix[box_pos.x][box_pos.y] != AIR
-                    or all(box_pos == self.maze.start)
-                    or all(box_pos == self.maze.end)
+                    or box_pos.y > len(maze.matrix[1]) - 2
+                    or box_pos.x > len(maze.matrix) - 2
+                    or maze.matrix[box_pos.x][box_pos.y] != AIR
+                    or box_pos == maze.start
+                    or box_pos == maze.end
                 ):
                     box_pos = Vec(
-                        self.maze.height // num_box_y // 2
-                        + (self.maze.height * 2 // num_box_y) * y
+                        maze.height // num_box_y // 2
+                        + (maze.height * 2 // num_box_y) * y
                         + randrange(-2, 2),
-                        self.maze.width * 2 // num_box_x // 2
-                        + (self.maze.width * 2 // num_box_x) * x
+                        maze.width * 2 // num_box_x // 2
+                        + (maze.width * 2 // num_box_x) * x
                         + randrange(-2, 2))
-                logging.debug("Box pos: {}".format(str(box_pos)))
+                logging.debug("Box pos: %s", box_pos)
                 box = Box(box_pos)
-                box.generate_map(self.maze, radius)
-                box.generate_image()
+                box.generate_map(maze, radius)
+                box.generate_image(maze)
                 box_list.append(box)
-        self.maze.boxes = box_list
+        maze.boxes = box_list
 
     def reset(self) -> None:
         """Reset this level"""
         for box in self.instance.maze.boxes:
-            box.needs_cleaning = False
+            box.leave(self.player)
         self.player.start_loc = self.instance.maze.mat2screen(mat=self.maze.start)
         self.player.start()
         self.instance.first_act = True
+        self.instance.hint_is_visible = False
+        self.instance.hint.shown = []
 
     @classmethod
     def reset_cls(cls):
         """Reset class"""
-        global random
-        cls.instance = None
-        cls.instance = InfiniteLevel(random)
+        level = cls.playing.find()
+        maze = cls.take_next(level.size)
+        cls.playing.set(None)
+        InfiniteLevel(level.random_pos, level.algorithm, level.size, maze=maze)
 
 
 class EndScene(Scene):
@@ -514,7 +769,8 @@ class EndScene(Scene):
         elif val.lower() == "q":
             return QUIT
         else:
-            inp = term.inkey()
+            # the game reads the keys, a scene only gets them
+            inp = val
             if inp.code == term.KEY_ENTER:
                 # save score
                 with open(os.path.join(dirname, "leaderboard.txt"), "a") as score_file:
@@ -675,11 +931,16 @@ def title_menu_action(choice: str) -> Union[int, None]:
         return QUIT
 
 
-title_scene = Menu(
-    txt=["Welcome :)", ""],
-    choices=["Start", "Infinite", "Tutorial", "Credits", "Leaderboard", "Quit"],
-    action_on_choice=title_menu_action,
-)
+def new_title_menu() -> Menu:
+    """Return the title menu, every session has its own"""
+    return Menu(
+        txt=["Welcome :)", ""],
+        choices=["Start", "Infinite", "Tutorial", "Credits", "Leaderboard", "Quit"],
+        action_on_choice=title_menu_action,
+    )
+
+
+title_scene = new_title_menu()
 
 
 def credit_menu_action(choice: str) -> Union[int, None]:
@@ -690,20 +951,25 @@ def credit_menu_action(choice: str) -> Union[int, None]:
     return None
 
 
-credit_scene = Menu(
-    txt=["Creidts", ""],
-    choices=[
-        "Anand",
-        "Pritam Dey",
-        "Jason Ho",
-        "Himi",
-        "Olivia",
-        "StoneSteel",
-        "",
-        "Back",
-    ],
-    action_on_choice=credit_menu_action,
-)
+def new_credit_menu() -> Menu:
+    """Return the credits, every session has its own"""
+    return Menu(
+        txt=["Creidts", ""],
+        choices=[
+            "Anand",
+            "Pritam Dey",
+            "Jason Ho",
+            "Himi",
+            "Olivia",
+            "StoneSteel",
+            "",
+            "Back",
+        ],
+        action_on_choice=credit_menu_action,
+    )
+
+
+credit_scene = new_credit_menu()
 
 
 def pause_menu_action(choice: str) -> Union[int, None]:
@@ -717,11 +983,16 @@ def pause_menu_action(choice: str) -> Union[int, None]:
     return None
 
 
-pause_menu = Menu(
-    txt=["Game Paused", ""],
-    choices=["Return", "Main menu", "Quit"],
-    action_on_choice=pause_menu_action,
-)
+def new_pause_menu() -> Menu:
+    """Return the pause menu, every session has its own"""
+    return Menu(
+        txt=["Game Paused", ""],
+        choices=["Return", "Main menu", "Quit"],
+        action_on_choice=pause_menu_action,
+    )
+
+
+pause_menu = new_pause_menu()
 
 
 def leaderboard_action(choice: str) -> Union[None, int]:
@@ -746,9 +1017,14 @@ def leaderboard_first_frame() -> List[str]:
     return players_sorted
 
 
-leaderboard_menu = Menu(
-    txt=["Leaderboard", ""],
-    choices=["Main Menu"],
-    action_on_choice=leaderboard_action,
-    action_on_first_frame=leaderboard_first_frame,
-)
+def new_leaderboard_menu() -> Menu:
+    """Return the leaderboard, every session has its own"""
+    return Menu(
+        txt=["Leaderboard", ""],
+        choices=["Main Menu"],
+        action_on_choice=leaderboard_action,
+        action_on_first_frame=leaderboard_first_frame,
+    )
+
+
+leaderboard_menu = new_leaderboard_menu()
@@ -0,0 +1,215 @@
+"""Serve the game to many players at once over telnet.
+
+Every connection plays a game of its own in a session of its own, see
+`maze_gitb.core.session`: its own terminal, renderer, player and scenes,
+all in the one event loop of the server. The terminal of a session is a
+`HeadlessTerminal` of the size the client tells with NAWS, the keys come
+from the socket and the frames go back on it. Sounds aren't sent, and as the
+terminals are headless the server plays none, see `maze_gitb.core.audio`.
+
+Making the scenes of a session takes 20 to 60 ms, and a new maze of the
+infinite level about 20 ms at 120x40, growing with the area. Both are
+built on another thread, see `build_in_thread`, so the other players don't
+wait for them, and windows bigger than `MAX_SIZE` are played at that size
+to bound them.
+
+Play with `telnet localhost 2323` in a terminal of at least 120x40.
+
+Run from the repository root:
+    PYTHONPATH=src python -m maze_gitb.server [--host 127.0.0.1] [--port 2323] [--size 120x40]
+"""
+import argparse
+import asyncio
+import codecs
+import itertools
+import logging
+import struct
+from functools import partial
+from typing import List, Tuple
+
+from maze_gitb.core.session import build_in_thread, new_session
+from maze_gitb.core.terminal import HeadlessTerminal, parse_size, use_terminal
+from maze_gitb.game import EOF
+from maze_gitb.main import new_game
+
+# telnet commands and options, RFC 854, 857, 858 and 1073
+IAC, DONT, DO, WONT, WILL, SB, SE = 255, 254, 253, 252, 251, 250, 240
+ECHO, SGA, NAWS = 1, 3, 31
+# the server echoes and sends characters as they are typed, and wants the window size
+GREETING = bytes([IAC, WILL, ECHO, IAC, WILL, SGA, IAC, DO, NAWS])
+
+# longest a new player waits for the client to tell its window size, in seconds
+NAWS_WAIT = 0.5
+# longest a game that lost its player takes to end, in seconds
+LEAVE_WAIT = 1.0
+# keys that leave the game, ctrl-c and ctrl-d
+LEAVE = ("\x03", "\x04")
+# biggest window played, as wide as a full screen terminal on a 4K display
+MAX_SIZE = (400, 150)
+
+players = itertools.count(1)
+
+
+class Telnet:
+    """Splits what a telnet client sends into text and window sizes.
+
+    Commands cut in two by the network are kept until the rest comes.
+    """
+
+    def __init__(self) -> None:
+        self.pending = b""
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def feed(self, data: bytes) -> Tuple[str, List[Tuple[int, int]]]:
+        """Return the text in data and the window sizes the client told"""
+        data = self.pending + data
+        text = bytearray()
+        sizes = []
+        i = 0
+        while i < len(data):
+            if data[i] != IAC:
+                text.append(data[i])
+                i += 1
+                continue
+            if i + 1 == len(data):
+                break
+            command = data[i + 1]
+            if command == IAC:
+                text.append(IAC)
+                i += 2
+            elif command in (WILL, WONT, DO, DONT):
+                if i + 2 == len(data):
+                    break
+                i += 3
+            elif command == SB:
+                end = data.find(bytes([IAC, SE]), i)
+                if end < 0:
+                    break
+                option = data[i + 2:end]
+                if option[:1] == bytes([NAWS]) and len(option) == 5:
+                    sizes.append(struct.unpack(">HH", option[1:]))
+                i = end + 2
+            else:
+                i += 2
+        self.pending = data[i:]
+        # the enter key sends CR LF or CR NUL
+        return self.decoder.decode(bytes(text)).replace("\r\n", "\r").replace("\r\0", "\r"), sizes
+
+
+class SocketWriter:
+    """Writes frames to the socket of a player, like `FrameWriter` does to a terminal"""
+
+    def __init__(self, stream: asyncio.StreamWriter, encoding: str = "utf-8") -> None:
+        self.stream = stream
+        self.encoding = encoding
+        self.frames = 0
+        self.bytes = 0
+
+    def write(self, frame: str) -> int:
+        """Send frame and return its size in bytes"""
+        data = frame.encode(self.encoding)
+        if data:
+            self.stream.write(data)
+            self.frames += 1
+            self.bytes += len(data)
+        return len(data)
+
+    async def drain(self) -> None:
+        """Wait while the player is behind on the frames sent"""
+        await self.stream.drain()
+
+    def report(self) -> str:
+        """Return frame statistics"""
+        return f"sent {self.frames} frames, {self.bytes} bytes"
+
+
+async def play(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, size: Tuple[int, int]) -> None:
+    """Play a game with one player until they quit or leave, in a session of its own"""
+    player = next(players)
+    terminal = use_terminal(HeadlessTerminal(*size))
+    keys: "asyncio.Queue" = asyncio.Queue()
+    told_size = asyncio.Event()
+    game = None
+
+    async def read_keys() -> None:
+        """Put the keys the player sends in keys, then EOF"""
+        telnet = Telnet()
+        try:
+            while True:
+                data = await reader.read(4096)
+                if not data:
+                    return
+                text, sizes = telnet.feed(data)
+                for width, height in sizes[-1:]:
+                    terminal.resize(min(width, MAX_SIZE[0]), min(height, MAX_SIZE[1]))
+                    told_size.set()
+                    if game is not None:
+                        game.on_resize(keys)
+                for key in terminal.keystrokes(text):
+                    if key in LEAVE:
+                        return
+                    keys.put_nowait(key)
+        except ConnectionError:
+            pass
+        finally:
+            keys.put_nowait(EOF)
+
+    writer.write(GREETING)
+    reading = asyncio.ensure_future(read_keys())
+    try:
+        await asyncio.wait_for(told_size.wait(), NAWS_WAIT)
+    except asyncio.TimeoutError:
+        pass
+    logging.info(f"player {player} joined on a {terminal.width}x{terminal.height} terminal")
+    built_for = (terminal.width, terminal.height)
+    game = await build_in_thread(new_game, SocketWriter(writer))
+    if (terminal.width, terminal.height) != built_for:
+        # the window changed size while the scenes were made
+        game.on_resize(keys)
+    playing = asyncio.ensure_future(game.run_async(keys))
+    try:
+        await asyncio.wait({playing, reading}, return_when=asyncio.FIRST_COMPLETED)
+        # a player who left gave EOF, which ends the game at its next key
+        await asyncio.wait_for(playing, LEAVE_WAIT if reading.done() else None)
+    except (EOFError, ConnectionError, asyncio.TimeoutError):
+        pass
+    finally:
+        reading.cancel()
+        writer.close()
+        logging.info(f"player {player} left")
+
+
+async def connected(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, size: Tuple[int, int]) -> None:
+    """Play with a player who connected, in a new session"""
+    try:
+        await new_session().run(asyncio.ensure_future, play(reader, writer, size))
+    except Exception:
+        logging.exception("A game ended with an error")
+
+
+async def serve(host: str, port: int, size: Tuple[int, int]) -> None:
+    """Accept players until cancelled"""
+    server = await asyncio.start_server(partial(connected, size=size), host, port)
+    host, port = server.sockets[0].getsockname()[:2]
+    print(f"serving on {host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    """Run the server"""
+    parser = argparse.ArgumentParser(description="Serve the game to many players at once over telnet")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2323, help="0 picks a free port")
+    parser.add_argument("--size", type=parse_size, default=(120, 40), help="terminal size of clients without NAWS")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(args.log_level)
+    try:
+        asyncio.run(serve(args.host, args.port, args.size))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
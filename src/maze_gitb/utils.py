@@ -1,45 +1,67 @@
 # type: ignore
 """Collection of utilities."""
-from typing import Iterable, Union
+from operator import itemgetter
+from typing import Dict, Tuple, Union
 
 import numpy as np
 from blessed.terminal import Terminal
 
+VecLike = Union[int, Tuple[int, int]]
+SCALARS = (int, float, np.number)
 
-class Vec(np.ndarray):
-    """2D vector class that can be used with `int` and `(int, int)` for arithmetic."""
+
+class Vec(tuple):
+    """Immutable 2D vector that can be used with `int` and `(int, int)` for arithmetic.
+
+    Bulk geometry should use NumPy arrays, this is for single coordinates in the game loop.
+    """
+
+    __slots__ = ()
 
     def __new__(cls, x: int, y: int):
-        """Create new array."""
-        obj = super().__new__(
-            cls, (2,), np.int16, np.asarray((x, y)), offset=0, strides=None, order=None
-        )
-        obj.x = int(x)
-        obj.y = int(y)
-        return obj
+        """Create new vector."""
+        return tuple.__new__(cls, (int(x), int(y)))
+
+    x = property(itemgetter(0), doc="Get value of x as first co-ordinate")
+    y = property(itemgetter(1), doc="Get value of y as second co-ordinate")
+
+    def __getnewargs__(self) -> Tuple[int, int]:
+        return tuple(self)
+
+    def __repr__(self):
+        return f"Vec({self[0]}, {self[1]})"
+
+    def __add__(self, other: VecLike) -> "Vec":
+        if isinstance(other, SCALARS):
+            return Vec(self[0] + other, self[1] + other)
+        return Vec(self[0] + other[0], self[1] + other[1])
 
-    @property
-    def x(self) -> int:
-        """Get value of x as first co-ordinate"""
-        return int(self[0])
+    __radd__ = __add__
 
-    @property
-    def y(self) -> int:
-        """Get value of y as first co-ordinate"""
-        return int(self[1])
+    def __sub__(self, other: VecLike) -> "Vec":
+        if isinstance(other, SCALARS):
+            return Vec(self[0] - other, self[1] - other)
+        return Vec(self[0] - other[0], self[1] - other[1])
 
-    @x.setter
-    def x(self, x: Union[int, float]) -> None:
-        """Set value of x as first co-ordinate."""
-        self[0] = int(x)
+    def __rsub__(self, other: VecLike) -> "Vec":
+        if isinstance(other, SCALARS):
+            return Vec(other - self[0], other - self[1])
+        return Vec(other[0] - self[0], other[1] - self[1])
 
-    @y.setter
-    def y(self, y: Union[int, float]) -> None:
-        """Set value of y as first co-ordinate."""
-        self[1] = int(y)
+    def __mul__(self, other: VecLike) -> "Vec":
+        if isinstance(other, SCALARS):
+            return Vec(self[0] * other, self[1] * other)
+        return Vec(self[0] * other[0], self[1] * other[1])
 
-    def __iter__(self) -> Iterable:
-        return map(int, (self.x, self.y))
+    __rmul__ = __mul__
+
+    def __floordiv__(self, other: VecLike) -> "Vec":
+        if isinstance(other, SCALARS):
+            return Vec(self[0] // other, self[1] // other)
+        return Vec(self[0] // other[0], self[1] // other[1])
+
+    def __neg__(self) -> "Vec":
+        return Vec(-self[0], -self[1])
 
 
 class Boundary:
@@ -65,16 +87,70 @@ class Boundary:
         return "".join(my_map)
 
 
-def points_in_circle_np(radius: int, x0: int = 0, y0: int = 0, ) -> list:
-    """Return a list of point in the circle"""
-    result = []
+def bfs_distances(passable: np.ndarray, source: Tuple[int, int]) -> np.ndarray:
+    """Return the walking distance from `source` (row, column) to every cell, -1 where unreachable.
+
+    The whole frontier is expanded at once, so the work is O(cells) with one
+    NumPy step per unit of distance.
+    """
+    height, width = passable.shape
+    stride = width + 2
+    # pad with a border of walls so neighbours never wrap around
+    padded = np.zeros((height + 2, stride), dtype=bool)
+    padded[1:-1, 1:-1] = passable
+    passable = padded.ravel()
+    distances = np.full(passable.size, -1, dtype=np.int32)
+    steps = np.array([-stride, stride, -1, 1])
+
+    frontier = np.array([(source[0] + 1) * stride + source[1] + 1])
+    frontier = frontier[passable[frontier]]
+    distances[frontier] = 0
+    distance = 0
+    while frontier.size:
+        distance += 1
+        neighbours = (frontier[:, np.newaxis] + steps).ravel()
+        neighbours = neighbours[passable[neighbours] & (distances[neighbours] < 0)]
+        frontier = np.unique(neighbours)
+        distances[frontier] = distance
+    return distances.reshape(height + 2, stride)[1:-1, 1:-1]
+
+
+def _walls_ahead(walls: np.ndarray) -> np.ndarray:
+    """Return the number of columns from every cell to the next wall on its right, the edge counts as a wall"""
+    width = walls.shape[1]
+    columns = np.arange(width)
+    nearest = np.where(walls, columns, width)
+    ahead = np.full(walls.shape, width)
+    # running minimum from the right over the columns strictly after each cell
+    ahead[:, :-1] = np.minimum.accumulate(nearest[:, :0:-1], axis=1)[:, ::-1]
+    return (ahead - columns).astype(np.int32)
+
+
+def wall_distances(walls: np.ndarray) -> Dict[Tuple[int, int], np.ndarray]:
+    """Return the signed distance from every cell to the nearest wall in each (x, y) direction.
+
+    `walls` is a bool (row, column) grid. Distances toward the left and the top are negative.
+    """
+    return {
+        (1, 0): _walls_ahead(walls),
+        (-1, 0): -_walls_ahead(walls[:, ::-1])[:, ::-1],
+        (0, 1): _walls_ahead(walls.T).T,
+        (0, -1): -_walls_ahead(walls.T[:, ::-1])[:, ::-1].T,
+    }
+
+
+def circle_points(radius: int, x0: int = 0, y0: int = 0) -> np.ndarray:
+    """Return the (x, y) points in the circle that aren't below 0, as an array of rows"""
     x_ = np.arange(x0 - radius - 1, x0 + radius + 1, dtype=int)
     y_ = np.arange(y0 - radius - 1, y0 + radius + 1, dtype=int)
     x, y = np.where((x_[:, np.newaxis] - x0) ** 2 + (y_ - y0) ** 2 <= radius ** 2)
-    for x, y in zip(x_[x], y_[y]):
-        if x >= 0 and y >= 0:
-            result.append(Vec(x, y))
-    return result
+    points = np.stack([x_[x], y_[y]], axis=1)
+    return points[(points >= 0).all(axis=1)]
+
+
+def points_in_circle_np(radius: int, x0: int = 0, y0: int = 0, ) -> list:
+    """Return a list of point in the circle"""
+    return [Vec(x, y) for x, y in circle_points(radius, x0, y0).tolist()]
 
 
 if __name__ == "__main__":